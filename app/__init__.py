@@ -15,27 +15,88 @@ def create_app():
         SQLALCHEMY_DATABASE_URI=os.environ.get('DATABASE_URL') or
         'sqlite:///' + os.path.join(app.instance_path, 'app.db'),
         SQLALCHEMY_TRACK_MODIFICATIONS=False,
+        PAGE_SIZE=int(os.environ.get('PAGE_SIZE') or 100),
+        MAX_PAGE_SIZE=int(os.environ.get('MAX_PAGE_SIZE') or 1000),
+        STREAM_BATCH_SIZE=int(os.environ.get('STREAM_BATCH_SIZE') or 1000),
+        MAX_BULK_SIZE=int(os.environ.get('MAX_BULK_SIZE') or 5000),
+        PASSWORD_METHOD=os.environ.get('PASSWORD_METHOD') or 'pbkdf2:sha256',
+        PASSWORD_ITERATIONS=int(os.environ.get('PASSWORD_ITERATIONS') or
+                                260000),
+        PASSWORD_POOL_SIZE=int(os.environ.get('PASSWORD_POOL_SIZE') or 2),
+        PASSWORD_QUEUE_SIZE=int(os.environ.get('PASSWORD_QUEUE_SIZE') or 16),
+        RESPONSE_CACHE_URL=os.environ.get('RESPONSE_CACHE_URL') or
+        'memory://',
+        RESPONSE_CACHE_CLIENT=os.environ.get('RESPONSE_CACHE_CLIENT'),
+        RESPONSE_CACHE_SIZE=int(os.environ.get('RESPONSE_CACHE_SIZE') or 512),
+        RESPONSE_CACHE_TTL=int(os.environ.get('RESPONSE_CACHE_TTL') or 30),
+        TOKEN_CACHE_SIZE=int(os.environ.get('TOKEN_CACHE_SIZE') or 1024),
+        TOKEN_CACHE_TTL=int(os.environ.get('TOKEN_CACHE_TTL') or 60),
+        JWT_AUTH=os.environ.get('JWT_AUTH') == '1',
+        JWT_EXPIRES_IN=int(os.environ.get('JWT_EXPIRES_IN') or 900),
+        DENYLIST_REFRESH=int(os.environ.get('DENYLIST_REFRESH') or 5),
+        OVERDUE_SCAN_INTERVAL=int(os.environ.get('OVERDUE_SCAN_INTERVAL') or
+                                  0),
+        DB_POOL_SIZE=int(os.environ.get('DB_POOL_SIZE') or 5),
+        DB_MAX_OVERFLOW=int(os.environ.get('DB_MAX_OVERFLOW') or 10),
+        DB_POOL_TIMEOUT=int(os.environ.get('DB_POOL_TIMEOUT') or 30),
+        DB_POOL_RECYCLE=int(os.environ.get('DB_POOL_RECYCLE') or 1800),
+        DB_POOL_PRE_PING=os.environ.get('DB_POOL_PRE_PING') == '1',
+        DB_STATEMENT_TIMEOUT=int(os.environ.get('DB_STATEMENT_TIMEOUT') or 0),
+        SQL_DIAGNOSTICS=os.environ.get('SQL_DIAGNOSTICS') == '1',
+        SLOW_QUERY_MS=int(os.environ.get('SLOW_QUERY_MS') or 100),
+        REPEATED_QUERY_LIMIT=int(os.environ.get('REPEATED_QUERY_LIMIT') or 5),
+        JSON_ENCODER=os.environ.get('JSON_ENCODER') or 'auto',
     )
 
+    # JWTs are signed with SECRET_KEY, so the 'secret' fallback would let
+    # anyone forge them.
+    if app.config['JWT_AUTH'] and not os.environ.get('SECRET_KEY'):
+        raise RuntimeError('JWT_AUTH=1 requer SECRET_KEY no ambiente')
+
+    from app.models.pool import engine_options
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(app.config)
+
     try:
         os.makedirs(app.instance_path)
     except OSError:
         pass
 
-    CORS(app)
+    CORS(app, expose_headers=['X-Next-Cursor'])
 
     from flask_sslify import SSLify
     if 'DYNO' in os.environ:  # only trigger SSLify if app is running on Heroku
         sslify = SSLify(app)
 
-    from app.models import db, migrate
+    from app.models import (
+        db, migrate, passwords, token_cache, token_denylist
+    )
     db.init_app(app)
     migrate.init_app(app, db)
+    passwords.init_app(app)
+    token_cache.init_app(app)
+    token_denylist.init_app(app)
 
-    from app.cli import create_admin
+    from app.cli import (
+        check_indexes, create_admin, run_scheduler, scan_overdue, seed
+    )
     app.cli.add_command(create_admin)
+    app.cli.add_command(seed)
+    app.cli.add_command(check_indexes)
+    app.cli.add_command(scan_overdue)
+    app.cli.add_command(run_scheduler)
+
+    from app import serialization
+    serialization.init_app(app)
+
+    from app.metrics import request_metrics
+    request_metrics.init_app(app)
+
+    from app.diagnostics import query_diagnostics
+    query_diagnostics.init_app(app)
 
     from app.api import api
+    from app.api.cache import response_cache
     app.register_blueprint(api)
+    response_cache.init_app(app)
 
     return app
@@ -2,6 +2,8 @@ from flask import Blueprint
 
 api = Blueprint('api', __name__, url_prefix='/api')
 
+from app.api import transaction
 from app.api.controllers import (
-    categories, items, thirdparties, reservations, lendings, users, auth
+    categories, items, thirdparties, reservations, lendings, users, auth,
+    cache, search, stats, pool, metrics
 )
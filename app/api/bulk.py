@@ -0,0 +1,198 @@
+from flask import (
+    current_app, jsonify, request
+)
+from app.models import db, StatCounter, TableVersion
+from app.api.errors import bad_request, internal_server
+from app.api.transaction import mark_written
+
+CHUNK_SIZE = 500
+
+
+def existing_values(column, values: set) -> set:
+    found = set()
+    values = list(values)
+    for i in range(0, len(values), CHUNK_SIZE):
+        chunk = values[i:i + CHUNK_SIZE]
+        found.update(
+            value for value,
+            in db.session.query(column).filter(column.in_(chunk))
+        )
+    return found
+
+
+def existing_ids(column, values: set) -> dict:
+    """Map each of `values` found in `column` to the id of its row."""
+    found = {}
+    values = list(values)
+    for i in range(0, len(values), CHUNK_SIZE):
+        chunk = values[i:i + CHUNK_SIZE]
+        found.update(
+            db.session.query(column, column.class_.id)
+            .filter(column.in_(chunk))
+        )
+    return found
+
+
+def read_rows():
+    """Return the request's JSON array of rows and an error response, if
+    any.
+    """
+    data = request.get_json()
+    if not isinstance(data, list) or len(data) == 0:
+        return None, bad_request('pedido deve ser uma lista não vazia')
+    if len(data) > current_app.config['MAX_BULK_SIZE']:
+        return None, bad_request(
+            f"pedido deve ter no máximo "
+            f"{current_app.config['MAX_BULK_SIZE']} registros"
+        )
+    return data, None
+
+
+def check_rows(model, data: list, new: bool, errors: dict,
+               unique: dict = None, references: dict = None):
+    """Add to `errors` the rows failing `check_data`, `unique` or
+    `references`, resolving each constraint with one IN query per chunk.
+    """
+    for index, row in enumerate(data):
+        if index in errors:
+            continue
+        if not isinstance(row, dict):
+            errors[index] = 'registro deve ser um objeto'
+        elif new:
+            error = model.check_data(data=row, new=True)
+            if error:
+                errors[index] = error
+        else:
+            values = {key: value for key, value in row.items()
+                      if key != 'id'}
+            error = model.check_data(data=values)
+            if error:
+                errors[index] = error
+            row.update(values)
+
+    def valid_rows(field):
+        for index, row in enumerate(data):
+            if index not in errors and row.get(field) is not None:
+                yield index, row[field]
+
+    for field, message in (unique or {}).items():
+        taken = existing_ids(getattr(model, field),
+                             {value for _, value in valid_rows(field)})
+        for index, value in list(valid_rows(field)):
+            id = data[index].get('id')
+            if value in taken and (new or taken[value] != id):
+                errors[index] = message
+            taken[value] = id
+
+    for field, (target, message) in (references or {}).items():
+        found = existing_values(target.id,
+                                {value for _, value in valid_rows(field)})
+        for index, value in list(valid_rows(field)):
+            if value not in found:
+                errors[index] = message
+
+
+def errors_response(errors: dict):
+    response = jsonify({
+        'error': 'Bad Request',
+        'message': 'registros inválidos',
+        'errors': [{'index': index, 'message': errors[index]}
+                   for index in sorted(errors)]
+    })
+    response.status_code = 400
+    return response
+
+
+def bulk_create(model, fields: list, unique: dict = None,
+                references: dict = None, defaults: dict = None):
+    """Validate and insert a JSON array of `model` rows in one transaction.
+
+    `unique` maps a field to the message used when its value is taken and
+    `references` maps a foreign key field to (Model, message). Each
+    constraint is resolved with one IN query per chunk of values. Nothing
+    is inserted unless every row is valid; otherwise the response lists
+    the error of each rejected row. `defaults` maps a field to a function
+    called once, after validation, for the value every row gets.
+    """
+    data, error = read_rows()
+    if error:
+        return error
+
+    errors = {}
+    check_rows(model, data, True, errors, unique, references)
+    if errors:
+        return errors_response(errors)
+
+    values = {field: default() for field, default in
+              (defaults or {}).items()}
+    mappings = []
+    for row in data:
+        mapping = {field: row[field] for field in fields if field in row}
+        mapping.update(values)
+        mappings.append(mapping)
+
+    try:
+        db.session.bulk_insert_mappings(model, mappings)
+        TableVersion.bump(db.session, [model.__table__.name])
+        StatCounter.recount(db.session, [model.__table__.name])
+        mark_written()
+    except Exception:
+        return internal_server()
+
+    return jsonify({'created': len(mappings)}), 201
+
+
+def bulk_update(model, fields: list, unique: dict = None,
+                references: dict = None):
+    """Validate and update a JSON array of `model` rows, each with its
+    `id`, in one transaction.
+
+    The rows are looked up with one IN query per chunk of ids and the
+    constraints are checked as in `bulk_create`. Values may only move to
+    rows outside the batch, so swapping unique values takes two requests.
+    """
+    data, error = read_rows()
+    if error:
+        return error
+
+    errors = {}
+    ids = {}
+    seen = set()
+    for index, row in enumerate(data):
+        if not isinstance(row, dict):
+            continue
+        id = row.get('id')
+        invalid = [key for key in row if key != 'id' and key not in fields]
+        if invalid:
+            errors[index] = f'campo inválido: {invalid[0]}'
+        elif type(id) != int:
+            errors[index] = 'campo id deve ser um inteiro'
+        elif id in seen:
+            errors[index] = 'id repetido'
+        else:
+            ids[index] = id
+            seen.add(id)
+    found = existing_values(model.id, seen)
+    for index, id in ids.items():
+        if id not in found:
+            errors[index] = 'registro não encontrado'
+
+    check_rows(model, data, False, errors, unique, references)
+    if errors:
+        return errors_response(errors)
+
+    mappings = [
+        dict({field: row[field] for field in fields if field in row},
+             id=row['id'])
+        for row in data
+    ]
+
+    try:
+        db.session.bulk_update_mappings(model, mappings)
+        TableVersion.bump(db.session, [model.__table__.name])
+        StatCounter.recount(db.session, [model.__table__.name])
+        mark_written()
+    except Exception:
+        return internal_server()
+
+    return jsonify({'updated': len(mappings)})
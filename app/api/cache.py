@@ -0,0 +1,166 @@
+import functools
+import threading
+from collections import OrderedDict
+from datetime import datetime as dt
+from time import monotonic
+from flask import (
+    Response, make_response, request
+)
+from werkzeug.utils import import_string
+from app.api.conditional import table_versions
+from app.api.expand import request_tables
+from app.api.pagination import wants_stream
+
+
+class LRUBackend:
+    """In-process LRU, private to each worker."""
+
+    def __init__(self, maxsize: int = 512):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at <= monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: bytes, ex: int):
+        with self._lock:
+            self._entries[key] = (value, monotonic() + ex)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+
+class RedisBackend:
+    """Shared backend over any client with Redis' get and set."""
+
+    def __init__(self, client):
+        self.client = client
+
+    @classmethod
+    def from_url(cls, url: str, client: str = None):
+        """Connect to `url` with the factory named by `client`, an import
+        path such as 'package.module:factory', or with redis-py.
+        """
+        if client:
+            return cls(import_string(client)(url))
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError('RESPONSE_CACHE_URL=redis:// requer o pacote '
+                               'redis (pipenv install --categories cache)')
+        return cls(redis.Redis.from_url(url))
+
+    def get(self, key: str):
+        return self.client.get(key)
+
+    def set(self, key: str, value: bytes, ex: int):
+        self.client.set(key, value, ex=ex)
+
+
+class ResponseCache:
+    """Serialized JSON responses keyed by URL and table versions.
+
+    Committing a write to a table bumps its row in table_version, so every
+    entry built from it stops being reachable at once, in every worker.
+    """
+
+    def __init__(self):
+        self.backend = None
+        self.ttl = 30
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        url = app.config.get('RESPONSE_CACHE_URL', 'memory://')
+        size = app.config.get('RESPONSE_CACHE_SIZE', 512)
+        self.ttl = app.config.get('RESPONSE_CACHE_TTL', self.ttl)
+        if url.startswith('redis://') or url.startswith('rediss://'):
+            self.backend = RedisBackend.from_url(
+                url, app.config.get('RESPONSE_CACHE_CLIENT')
+            )
+        elif size > 0:
+            self.backend = LRUBackend(size)
+        else:
+            self.backend = None
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, versions: dict, per_minute: bool) -> str:
+        parts = [f'{table}.{version}' for table, version in versions.items()]
+        if per_minute:
+            parts.append(dt.utcnow().strftime('%Y%m%d%H%M'))
+        return 'response:' + ':'.join(parts) + ':' + request.full_path
+
+    def record(self, hit: bool):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            hits, misses = self.hits, self.misses
+        total = hits + misses
+        return {
+            'backend': type(self.backend).__name__ if self.backend else None,
+            'hits': hits,
+            'misses': misses,
+            'hit_ratio': hits / total if total else None
+        }
+
+
+response_cache = ResponseCache()
+
+
+def cached(*tables, per_minute: bool = False):
+    """Serve the view's JSON from `response_cache` while `tables` are
+    unchanged. Streamed responses are never cached.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapped_view(**kwargs):
+            if response_cache.backend is None or wants_stream():
+                return view(**kwargs)
+
+            names = request_tables(tables)
+            versions = table_versions(names)
+            if len(versions) < len(names):
+                return view(**kwargs)
+
+            key = response_cache.key(versions, per_minute)
+            value = response_cache.backend.get(key)
+            if value is not None:
+                response_cache.record(hit=True)
+                cursor, body = value.split(b'\n', 1)
+                response = Response(body, mimetype='application/json')
+                if cursor:
+                    response.headers['X-Next-Cursor'] = cursor.decode()
+                response.headers['X-Cache'] = 'HIT'
+                return response
+
+            response_cache.record(hit=False)
+            response = make_response(view(**kwargs))
+            if response.status_code == 200 and not response.is_streamed:
+                cursor = response.headers.get('X-Next-Cursor', '')
+                response_cache.backend.set(
+                    key, cursor.encode() + b'\n' + response.get_data(),
+                    response_cache.ttl
+                )
+            response.headers['X-Cache'] = 'MISS'
+            return response
+
+        return wrapped_view
+
+    return decorator
@@ -0,0 +1,53 @@
+import functools
+from datetime import datetime as dt
+from hashlib import sha1
+from flask import (
+    Response, g, make_response, request
+)
+from app.models import TableVersion
+from app.api.expand import request_tables
+
+
+def table_versions(names) -> dict:
+    """Versions of `names`, read once per request."""
+    known = g.setdefault('table_versions', {})
+    missing = [name for name in names if name not in known]
+    if missing:
+        known.update(TableVersion.current(missing))
+    return {name: known[name] for name in names if name in known}
+
+
+def conditional(*tables, per_minute: bool = False):
+    """Answer If-None-Match from the versions of `tables`.
+
+    The ETag is derived from the table versions, the URL and the Accept
+    header, so a matching request gets a 304 without running the view.
+    Views whose result depends on the current time pass `per_minute`.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapped_view(**kwargs):
+            names = request_tables(tables)
+            versions = table_versions(names)
+            if len(versions) < len(names):
+                return view(**kwargs)
+
+            parts = [f'{table}.{versions[table]}' for table in names]
+            if per_minute:
+                parts.append(dt.utcnow().strftime('%Y%m%d%H%M'))
+            parts += [request.full_path,
+                      request.headers.get('Accept', '')]
+            etag = sha1('|'.join(parts).encode()).hexdigest()
+
+            if etag in request.if_none_match:
+                response = Response(status=304)
+            else:
+                response = make_response(view(**kwargs))
+                if response.status_code != 200:
+                    return response
+            response.set_etag(etag)
+            return response
+
+        return wrapped_view
+
+    return decorator
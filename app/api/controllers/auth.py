@@ -1,17 +1,20 @@
 import os
 import functools
 from flask import (
-    request, jsonify, g
+    current_app, request, jsonify, g
 )
-from app.models import User
+from app.models import RevokedToken, User
+from app.models.passwords import PasswordHasherBusy
 from app.api.errors import (
-    bad_request, unauthorized
+    bad_request, service_unavailable, unauthorized
 )
 from app.api import api
 
 
 class Admin:
+    id = None
     admin = True
+    jti = None
 
 
 def token_required(view):
@@ -52,9 +55,17 @@ def login():
     elif not user.check_password(data['password']):
         return bad_request('senha incorreta')
 
+    if user.password_needs_rehash():
+        user.set_password(data['password'])
+
+    if current_app.config['JWT_AUTH']:
+        token = user.get_jwt(current_app.config['JWT_EXPIRES_IN'])
+    else:
+        token = user.get_token()
+
     response = {
         'message': 'use este token no cabeçalho Authentication',
-        'token': user.get_token(),
+        'token': token,
         'id': user.id
     }
     return jsonify(response), 200
@@ -70,14 +81,15 @@ def change_password():
             or 'new_confirm' not in data:
         return bad_request('missing fields')
 
-    if g.user is None:
+    user = User.query.get(g.user.id) if g.user is not None else None
+    if user is None:
         return bad_request('é necessário estar logado')
-    elif not g.user.check_password(data['old_password']):
+    elif not user.check_password(data['old_password']):
         return bad_request('senha incorreta')
     elif data['new_password'] != data['new_confirm']:
         return bad_request('nova senha e confirmação devem ser iguais')
 
-    g.user.set_password(data['new_password'])
+    user.set_password(data['new_password'])
 
     return '', 204
 
@@ -85,10 +97,22 @@ def change_password():
 @api.route('/logout', methods=['GET'])
 @token_required
 def logout():
-    g.user.revoke_token()
+    if g.user.jti is not None:
+        RevokedToken.revoke(g.user.jti, g.user.token_exp)
+        return '', 204
+
+    user = User.query.get(g.user.id)
+    if user is None:
+        return bad_request('é necessário estar logado')
+    user.revoke_token()
     return '', 204
 
 
+@api.errorhandler(PasswordHasherBusy)
+def password_hasher_busy(error):
+    return service_unavailable('servidor ocupado, tente novamente')
+
+
 @api.before_app_request
 def load_logged_in_user():
     token = request.headers.get('Authorization')
@@ -99,5 +123,7 @@ def load_logged_in_user():
         token = token.split()[-1]
         if token == os.environ.get('SECRET_KEY'):
             g.user = Admin()
+        elif current_app.config['JWT_AUTH'] and token.count('.') == 2:
+            g.user = User.check_jwt(token)
         else:
             g.user = User.check_token(token.split()[-1])
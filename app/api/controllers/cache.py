@@ -0,0 +1,10 @@
+from flask import jsonify
+from app.api import api
+from app.api.cache import response_cache
+from app.api.controllers.auth import admin_required
+
+
+@api.route('/cache', methods=['GET'])
+@admin_required
+def get_cache_stats():
+    return jsonify(response_cache.stats())
@@ -8,6 +8,9 @@ from app.api.errors import (
     bad_request, internal_server, not_found
 )
 from app.api import api
+from app.api.cache import cached
+from app.api.conditional import conditional
+from app.api.pagination import paginate
 from app.api.controllers.auth import token_required
 
 
@@ -28,7 +31,7 @@ def create_category():
 
     try:
         db.session.add(category)
-        db.session.commit()
+        db.session.flush()
     except Exception:
         return internal_server()
 
@@ -37,14 +40,15 @@ def create_category():
 
 @api.route('/categories', methods=['GET'])
 @token_required
+@conditional('category')
+@cached('category')
 def get_categories():
-    return jsonify(
-        [category.to_dict() for category in Category.query.all()]
-    )
+    return paginate(Category.query, Category)
 
 
 @api.route('/categories/<int:id>', methods=['GET'])
 @token_required
+@conditional('category')
 def get_category(id: int):
     category = Category.query.filter_by(id=id).first()
     if category is None:
@@ -70,7 +74,7 @@ def update_category(id: int):
 
     category.from_dict(data)
     try:
-        db.session.commit()
+        db.session.flush()
     except Exception:
         return internal_server()
 
@@ -86,7 +90,7 @@ def delete_category(id: int):
 
     try:
         db.session.delete(category)
-        db.session.commit()
+        db.session.flush()
     except Exception:
         return internal_server()
 
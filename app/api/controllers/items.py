@@ -8,6 +8,10 @@ from app.api.errors import (
     bad_request, internal_server, not_found
 )
 from app.api import api
+from app.api.bulk import bulk_create, bulk_update
+from app.api.cache import cached
+from app.api.conditional import conditional
+from app.api.pagination import paginate
 from app.api.controllers.auth import token_required
 
 
@@ -31,31 +35,53 @@ def create_item():
 
     try:
         db.session.add(item)
-        db.session.commit()
+        db.session.flush()
     except Exception:
         return internal_server()
 
     return jsonify(item.to_dict()), 201
 
 
+@api.route('/items/bulk', methods=['POST'])
+@token_required
+def create_items():
+    return bulk_create(
+        Item,
+        ['registry', 'name', 'description', 'category_id', 'available'],
+        unique={'registry': 'tombo já existe'},
+        references={'category_id': (Category, 'categoria não existe')}
+    )
+
+
+@api.route('/items/bulk', methods=['PUT'])
+@token_required
+def update_items():
+    return bulk_update(
+        Item,
+        ['registry', 'name', 'description', 'category_id', 'available'],
+        unique={'registry': 'tombo já existe'},
+        references={'category_id': (Category, 'categoria não existe')}
+    )
+
+
 @api.route('/items', methods=['GET'])
 @token_required
+@conditional('item')
+@cached('item')
 def get_available_items():
-    return jsonify(
-        [item.to_dict() for item in Item.query.filter(Item.available)]
-    )
+    return paginate(Item.query_available(), Item)
 
 
 @api.route('/items/all', methods=['GET'])
 @token_required
+@conditional('item')
 def get_all_items():
-    return jsonify(
-        [item.to_dict() for item in Item.query.all()]
-    )
+    return paginate(Item.query, Item)
 
 
 @api.route('/items/<int:id>', methods=['GET'])
 @token_required
+@conditional('item')
 def get_item(id: int):
     item = Item.query.filter_by(id=id).first()
     if item is None:
@@ -66,7 +92,7 @@ def get_item(id: int):
 @api.route('/items/<int:id>', methods=['PUT'])
 @token_required
 def update_item(id: int):
-    item = Item.query.filter_by(id=id).first()
+    item = Item.get_for_update(id)
     if item is None:
         return not_found('item não encontrado')
 
@@ -85,7 +111,7 @@ def update_item(id: int):
 
     item.from_dict(data)
     try:
-        db.session.commit()
+        db.session.flush()
     except Exception:
         return internal_server()
 
@@ -95,13 +121,13 @@ def update_item(id: int):
 @api.route('/items/<int:id>', methods=['DELETE'])
 @token_required
 def delete_item(id: int):
-    item = Item.query.filter_by(id=id).first()
+    item = Item.get_for_update(id)
     if item is None:
         return not_found('item não encontrado')
 
     try:
         db.session.delete(item)
-        db.session.commit()
+        db.session.flush()
     except Exception:
         return internal_server()
 
@@ -1,21 +1,52 @@
+from datetime import datetime as dt
 from flask import (
-    jsonify, request
+    g, jsonify, request
 )
 from app.models import (
-    db, Lending, User, Thirdparty, Item
+    db, Lending, OverdueLending, StatCounter, TableVersion, User, Thirdparty,
+    Item
 )
 from app.api.errors import (
-    bad_request, internal_server, not_found
+    bad_request, conflict, internal_server, not_found
 )
 from app.api import api
+from app.api.cache import cached
+from app.api.conditional import conditional
+from app.api.expand import get_expand
+from app.api.pagination import paginate
+from app.api.transaction import mark_written
 from app.api.controllers.auth import token_required
 
 
-@api.route('/lendings', methods=['POST'])
-@token_required
-def create_lending():
-    data = request.get_json() or {}
-
+def held_item(lending: Lending):
+    return lending.item_id if lending.date_return is None else None
+
+
+def move_item(released_id: int, claimed_id: int):
+    """Mark `released_id` as available and `claimed_id` as lent with
+    conditional UPDATEs. Return an error response if the claimed item does
+    not exist or is already lent.
+    """
+    if released_id == claimed_id:
+        return None
+    released = released_id is not None \
+        and Item.set_available(released_id, True)
+    claimed = False
+    if claimed_id is not None:
+        claimed = Item.set_available(claimed_id, False)
+        if not claimed:
+            if Item.query.get(claimed_id) is None:
+                return bad_request('item não existe')
+            return conflict('item não está disponível')
+    if released or claimed:
+        TableVersion.bump(db.session, ['item'])
+        StatCounter.add(db.session,
+                        {'available_items': int(released) - int(claimed)})
+        mark_written()
+    return None
+
+
+def lend(data: dict):
     error = Lending.check_data(data=data, new=True)
     if 'user_id' in data and data['user_id'] is not None and \
             User.query.get(data['user_id']) is None:
@@ -23,57 +54,114 @@ def create_lending():
     if 'thirdparty_id' in data and data['thirdparty_id'] is not None and \
             Thirdparty.query.get(data['thirdparty_id']) is None:
         error = 'terceiro não existe'
-    if 'item_id' in data and data['item_id'] is not None:
-        item = Item.query.get(data['item_id'])
-        if item is None:
-            error = 'item não existe'
-        if not item.available:
-            error = 'item não está disponível'
+    if data.get('item_id') is not None and \
+            data.get('date_return') is not None and \
+            Item.query.get(data['item_id']) is None:
+        error = 'item não existe'
     if error:
         return bad_request(error)
 
     lending = Lending()
     lending.from_dict(data)
+    error = move_item(None, held_item(lending))
+    if error:
+        return error
 
     try:
         db.session.add(lending)
-        db.session.commit()
+        db.session.flush()
     except Exception:
         return internal_server()
 
     return jsonify(lending.to_dict()), 201
 
 
+@api.route('/lendings', methods=['POST'])
+@token_required
+def create_lending():
+    return lend(request.get_json() or {})
+
+
+@api.route('/lendings/checkout', methods=['POST'])
+@token_required
+def checkout_lending():
+    """Lend an available item now. The item is marked as lent by a
+    conditional UPDATE in the same transaction, so concurrent checkouts of
+    one item get exactly one 201 and 409 for the rest.
+    """
+    data = request.get_json() or {}
+    if data.get('item_id') is None:
+        return bad_request('campo obrigatório: item_id')
+    if 'date_return' in data:
+        return bad_request('campo inválido: date_return')
+
+    data = dict(data)
+    data.setdefault('date_start', dt.utcnow().isoformat(timespec='minutes'))
+    data.setdefault('user_id', g.user.id)
+    return lend(data)
+
+
+@api.route('/lendings/<int:id>/return', methods=['POST'])
+@token_required
+def return_lending(id: int):
+    lending = Lending.get_for_update(id)
+    if lending is None:
+        return not_found('empréstimo não encontrado')
+    if lending.date_return is not None:
+        return conflict('empréstimo já devolvido')
+
+    item_id = held_item(lending)
+    lending.date_return = dt.utcnow()
+    move_item(item_id, None)
+    try:
+        db.session.flush()
+    except Exception:
+        return internal_server()
+
+    return jsonify(lending.to_dict())
+
+
 @api.route('/lendings', methods=['GET'])
 @token_required
+@conditional('lending')
+@cached('lending')
 def get_open_lendings():
-    return jsonify(
-        [lending.to_dict() for lending
-            in Lending.query.filter(Lending.date_return == None)]
-    )
+    return paginate(Lending.query_open(), Lending)
+
+
+@api.route('/lendings/overdue', methods=['GET'])
+@token_required
+@conditional('lending', 'overdue_lending')
+def get_overdue_lendings():
+    """Open lendings found overdue by the last `flask scan_overdue`."""
+    return paginate(OverdueLending.query_lendings(), Lending)
 
 
 @api.route('/lendings/all', methods=['GET'])
 @token_required
+@conditional('lending')
 def get_all_lendings():
-    return jsonify(
-        [lending.to_dict() for lending in Lending.query.all()]
-    )
+    return paginate(Lending.query, Lending)
 
 
 @api.route('/lendings/<int:id>', methods=['GET'])
 @token_required
+@conditional('lending')
 def get_lending(id: int):
+    expand, error = get_expand(Lending.expandable)
+    if error:
+        return bad_request(error)
+
     lending = Lending.query.filter_by(id=id).first()
     if lending is None:
         return not_found('empréstimo não encontrado')
-    return jsonify(lending.to_dict())
+    return jsonify(lending.to_dict(expand))
 
 
 @api.route('/lendings/<int:id>', methods=['PUT'])
 @token_required
 def update_lending(id: int):
-    lending = Lending.query.filter_by(id=id).first()
+    lending = Lending.get_for_update(id)
     if lending is None:
         return not_found('empréstimo não encontrado')
 
@@ -86,21 +174,17 @@ def update_lending(id: int):
     if 'thirdparty_id' in data and data['thirdparty_id'] is not None and \
             Thirdparty.query.get(data['thirdparty_id']) is None:
         error = 'terceiro não existe'
-    if 'item_id' in data and data['item_id'] != lending.item_id and \
-            data['item_id'] is not None:
-        item = Item.query.get(data['item_id'])
-        if item is None:
-            error = 'item não existe'
-        if not item.available:
-            error = 'item não está disponível'
-        else:
-            item.available = False
     if error:
         return bad_request(error)
 
+    released_id = held_item(lending)
     lending.from_dict(data)
+    error = move_item(released_id, held_item(lending))
+    if error:
+        return error
+
     try:
-        db.session.commit()
+        db.session.flush()
     except Exception:
         return internal_server()
 
@@ -110,13 +194,14 @@ def update_lending(id: int):
 @api.route('/lendings/<int:id>', methods=['DELETE'])
 @token_required
 def delete_lending(id: int):
-    lending = Lending.query.filter_by(id=id).first()
+    lending = Lending.get_for_update(id)
     if lending is None:
         return not_found('empréstimo não encontrado')
 
+    move_item(held_item(lending), None)
     try:
         db.session.delete(lending)
-        db.session.commit()
+        db.session.flush()
     except Exception:
         return internal_server()
 
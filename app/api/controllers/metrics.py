@@ -0,0 +1,22 @@
+from flask import Response
+from app.metrics import request_metrics
+from app.models import db
+from app.models.pool import pool_stats
+from app.api import api
+from app.api.controllers.auth import admin_required
+
+
+def pool_gauges() -> list:
+    lines = []
+    for key, value in pool_stats(db.engine.pool).items():
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            name = f'quartermaster_db_pool_{key}'
+            lines += [f'# TYPE {name} gauge', f'{name} {value}']
+    return lines
+
+
+@api.route('/metrics', methods=['GET'])
+@admin_required
+def get_metrics():
+    body = request_metrics.render() + '\n'.join(pool_gauges()) + '\n'
+    return Response(body, mimetype='text/plain; version=0.0.4')
@@ -0,0 +1,11 @@
+from flask import jsonify
+from app.models import db
+from app.models.pool import pool_stats
+from app.api import api
+from app.api.controllers.auth import admin_required
+
+
+@api.route('/pool', methods=['GET'])
+@admin_required
+def get_pool_stats():
+    return jsonify(pool_stats(db.engine.pool))
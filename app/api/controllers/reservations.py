@@ -1,17 +1,32 @@
-from datetime import datetime as dt
+from datetime import datetime as dt, timedelta
 from flask import (
     jsonify, request
 )
+from sqlalchemy.exc import IntegrityError
 from app.models import (
     db, Reservation, User, Thirdparty
 )
+import app.models.utils as utils
 from app.api.errors import (
     bad_request, internal_server, not_found
 )
 from app.api import api
+from app.api.cache import cached
+from app.api.conditional import conditional
+from app.api.expand import get_expand
+from app.api.pagination import paginate
 from app.api.controllers.auth import token_required
 
 
+def period_taken(error: IntegrityError):
+    """Answer a write rejected by the period constraint like a conflict
+    found by `Reservation.find_conflict`.
+    """
+    if Reservation.period_constraint in str(error.orig):
+        return bad_request('já existe um evento nesse período')
+    return internal_server()
+
+
 @api.route('/reservations', methods=['POST'])
 @token_required
 def create_reservation():
@@ -24,15 +39,8 @@ def create_reservation():
     if 'thirdparty_id' in data and data['thirdparty_id'] is not None and \
             Thirdparty.query.get(data['thirdparty_id']) is None:
         error = 'terceiro não existe'
-    if Reservation.query.filter(
-                Reservation.date_start >= data['date_start']
-            ).filter(
-                Reservation.date_start <= data['date_end']
-            ).all() or Reservation.query.filter(
-                Reservation.date_end >= data['date_start']
-            ).filter(
-                Reservation.date_end <= data['date_end']
-            ).all():
+    if not error and Reservation.find_conflict(data['date_start'],
+                                               data['date_end']):
         error = 'já existe um evento nesse período'
 
     if error:
@@ -43,7 +51,9 @@ def create_reservation():
 
     try:
         db.session.add(reservation)
-        db.session.commit()
+        db.session.flush()
+    except IntegrityError as e:
+        return period_taken(e)
     except Exception:
         return internal_server()
 
@@ -51,27 +61,68 @@ def create_reservation():
 
 
 @api.route('/reservations', methods=['GET'])
+@conditional('reservation', per_minute=True)
+@cached('reservation', per_minute=True)
 def get_open_reservations():
-    return jsonify(
-        [reservation.to_dict() for reservation
-            in Reservation.query.filter(Reservation.date_end >= dt.utcnow())]
-    )
+    return paginate(Reservation.query_open(), Reservation,
+                    default_sort='date_end')
 
 
 @api.route('/reservations/all', methods=['GET'])
+@conditional('reservation')
 def get_all_reservations():
-    return jsonify(
-        [reservation.to_dict() for reservation in Reservation.query.all()]
+    return paginate(Reservation.query, Reservation)
+
+
+@api.route('/reservations/availability', methods=['GET'])
+@conditional('reservation', per_minute=True)
+def get_availability():
+    args = {key: request.args[key] for key in ['from', 'to']
+            if key in request.args}
+    error = utils.check_datetime(args, 'from') \
+        or utils.check_datetime(args, 'to')
+    if error:
+        return bad_request(error)
+
+    date_from = args.get('from', dt.utcnow().replace(second=0,
+                                                     microsecond=0))
+    date_to = args.get('to', date_from + timedelta(days=7))
+    if date_to <= date_from:
+        return bad_request('from deve ser menor que to')
+
+    granularity = request.args.get('granularity', '1')
+    if not granularity.isdigit() or not 0 < int(granularity) <= 1440:
+        return bad_request('granularity deve ser um inteiro entre 1 e 1440')
+
+    busy, free = Reservation.availability(
+        date_from, date_to, timedelta(minutes=int(granularity))
     )
 
+    def dump(intervals):
+        return [[start.isoformat(timespec='minutes'),
+                 end.isoformat(timespec='minutes')]
+                for start, end in intervals]
+
+    return jsonify({
+        'from': date_from.isoformat(timespec='minutes'),
+        'to': date_to.isoformat(timespec='minutes'),
+        'busy': dump(busy),
+        'free': dump(free)
+    })
+
 
 @api.route('/reservations/<int:id>', methods=['GET'])
 @token_required
+@conditional('reservation')
 def get_reservation(id: int):
+    expand, error = get_expand(Reservation.expandable)
+    if error:
+        return bad_request(error)
+
     reservation = Reservation.query.filter_by(id=id).first()
     if reservation is None:
         return not_found('reserva não encontrada')
-    return jsonify(reservation.to_dict())
+    return jsonify(reservation.to_dict(expand))
 
 
 @api.route('/reservations/<int:id>', methods=['PUT'])
@@ -90,23 +141,23 @@ def update_reservation(id: int):
     if 'thirdparty_id' in data and data['thirdparty_id'] is not None and \
             Thirdparty.query.get(data['thirdparty_id']) is None:
         error = 'terceiro não existe'
-    if Reservation.query.filter(
-                Reservation.date_start >= data['date_start']
-            ).filter(
-                Reservation.date_start <= data['date_end']
-            ).all() or Reservation.query.filter(
-                Reservation.date_end >= data['date_start']
-            ).filter(
-                Reservation.date_end <= data['date_end']
-            ).all():
-        error = 'já existe um evento nesse período'
+    if not error and ('date_start' in data or 'date_end' in data):
+        date_start = data.get('date_start', reservation.date_start)
+        date_end = data.get('date_end', reservation.date_end)
+        if date_end <= date_start:
+            error = 'date_start deve ser menor que date_end'
+        elif Reservation.find_conflict(date_start, date_end,
+                                       exclude_id=reservation.id):
+            error = 'já existe um evento nesse período'
 
     if error:
         return bad_request(error)
 
     reservation.from_dict(data)
     try:
-        db.session.commit()
+        db.session.flush()
+    except IntegrityError as e:
+        return period_taken(e)
     except Exception:
         return internal_server()
 
@@ -122,7 +173,7 @@ def delete_reservation(id: int):
 
     try:
         db.session.delete(reservation)
-        db.session.commit()
+        db.session.flush()
     except Exception:
         return internal_server()
 
@@ -0,0 +1,27 @@
+from flask import (
+    jsonify, request
+)
+from app.models.search import search
+from app.api.errors import bad_request
+from app.api import api
+from app.api.conditional import conditional
+from app.api.controllers.auth import token_required
+
+
+@api.route('/search', methods=['GET'])
+@token_required
+@conditional('item', 'category', 'thirdparty')
+def get_search():
+    q = request.args.get('q', '')
+    if not q.strip():
+        return bad_request('parâmetro q obrigatório')
+
+    limit = request.args.get('limit', '20')
+    if not limit.isdigit() or not 0 < int(limit) <= 100:
+        return bad_request('limit deve ser um inteiro entre 1 e 100')
+
+    results = search(q, int(limit))
+    return jsonify({
+        model.__table__.name: [row.to_dict() for row in rows]
+        for model, rows in results.items()
+    })
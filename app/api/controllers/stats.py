@@ -0,0 +1,29 @@
+from datetime import datetime as dt
+from flask import jsonify
+from app.models import db, OverdueLending, Reservation, StatCounter
+from app.models.stat_counter import COUNTERS
+from app.api import api
+from app.api.conditional import conditional
+from app.api.controllers.auth import token_required
+
+
+@api.route('/stats', methods=['GET'])
+@token_required
+@conditional('item', 'lending', 'overdue_lending', 'reservation',
+             per_minute=True)
+def get_stats():
+    """Dashboard counts. Counts that do not depend on the clock are read
+    from stat_counter and overdue_lendings from the snapshot, like
+    /lendings/overdue. upcoming_reservations stays a count over the
+    date_start index: a counter would have to roll over every minute.
+    """
+    stats = StatCounter.current()
+    for name, (model, _, _, criterion) in COUNTERS.items():
+        if name not in stats:
+            stats[name] = db.session.query(db.func.count(model.id)) \
+                .filter(criterion).scalar()
+
+    stats['overdue_lendings'] = OverdueLending.query_lendings().count()
+    stats['upcoming_reservations'] = Reservation.query \
+        .filter(Reservation.date_start >= dt.utcnow()).count()
+    return jsonify(stats)
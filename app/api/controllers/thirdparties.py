@@ -8,6 +8,9 @@ from app.api.errors import (
     bad_request, internal_server, not_found
 )
 from app.api import api
+from app.api.bulk import bulk_create, bulk_update
+from app.api.conditional import conditional
+from app.api.pagination import paginate
 from app.api.controllers.auth import token_required
 
 
@@ -27,23 +30,43 @@ def create_thirdparty():
 
     try:
         db.session.add(thirdparty)
-        db.session.commit()
+        db.session.flush()
     except Exception:
         return internal_server()
 
     return jsonify(thirdparty.to_dict()), 201
 
 
+@api.route('/thirdparties/bulk', methods=['POST'])
+@token_required
+def create_thirdparties():
+    return bulk_create(
+        Thirdparty,
+        ['first_name', 'last_name', 'email', 'phone'],
+        unique={'email': 'email já existe'}
+    )
+
+
+@api.route('/thirdparties/bulk', methods=['PUT'])
+@token_required
+def update_thirdparties():
+    return bulk_update(
+        Thirdparty,
+        ['first_name', 'last_name', 'email', 'phone'],
+        unique={'email': 'email já existe'}
+    )
+
+
 @api.route('/thirdparties', methods=['GET'])
 @token_required
+@conditional('thirdparty')
 def get_thirdparties():
-    return jsonify(
-        [thirdparty.to_dict() for thirdparty in Thirdparty.query.all()]
-    )
+    return paginate(Thirdparty.query, Thirdparty)
 
 
 @api.route('/thirdparties/<int:id>', methods=['GET'])
 @token_required
+@conditional('thirdparty')
 def get_thirdparty(id: int):
     thirdparty = Thirdparty.query.filter_by(id=id).first()
     if thirdparty is None:
@@ -69,7 +92,7 @@ def update_thirdparty(id: int):
 
     thirdparty.from_dict(data)
     try:
-        db.session.commit()
+        db.session.flush()
     except Exception:
         return internal_server()
 
@@ -85,7 +108,7 @@ def delete_thirdparty(id: int):
 
     try:
         db.session.delete(thirdparty)
-        db.session.commit()
+        db.session.flush()
     except Exception:
         return internal_server()
 
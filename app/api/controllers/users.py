@@ -8,6 +8,9 @@ from app.api.errors import (
     bad_request, internal_server, not_found
 )
 from app.api import api
+from app.api.bulk import bulk_create, bulk_update
+from app.api.conditional import conditional
+from app.api.pagination import paginate
 from app.api.controllers.auth import (
     admin_required, token_required
 )
@@ -30,23 +33,46 @@ def create_user():
 
     try:
         db.session.add(user)
-        db.session.commit()
+        db.session.flush()
     except Exception:
         return internal_server()
 
     return jsonify(user.to_dict()), 201
 
 
+@api.route('/users/bulk', methods=['POST'])
+@admin_required
+def create_users():
+    return bulk_create(
+        User,
+        ['first_name', 'last_name', 'email', 'admin'],
+        unique={'email': 'email já existe'},
+        defaults={'password': User.default_password_hash}
+    )
+
+
+@api.route('/users/bulk', methods=['PUT'])
+@admin_required
+def update_users():
+    # admin stays out: bulk updates skip the mapper events that drop the
+    # cached identity of a demoted user's token.
+    return bulk_update(
+        User,
+        ['first_name', 'last_name', 'email'],
+        unique={'email': 'email já existe'}
+    )
+
+
 @api.route('/users', methods=['GET'])
 @token_required
+@conditional('user')
 def get_users():
-    return jsonify(
-        [user.to_dict() for user in User.query.all()]
-    )
+    return paginate(User.query, User)
 
 
 @api.route('/users/<int:id>', methods=['GET'])
 @token_required
+@conditional('user')
 def get_user(id):
     user = User.query.filter_by(id=id).first()
     if user is None:
@@ -71,7 +97,7 @@ def update_user(id):
 
     user.from_dict(data)
     try:
-        db.session.commit()
+        db.session.flush()
     except Exception:
         return internal_server()
 
@@ -87,7 +113,7 @@ def delete_user(id):
 
     try:
         db.session.delete(user)
-        db.session.commit()
+        db.session.flush()
     except Exception:
         return internal_server()
 
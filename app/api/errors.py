@@ -26,6 +26,14 @@ def not_found(message):
     return build_error_response(404, message)
 
 
+def conflict(message):
+    return build_error_response(409, message)
+
+
+def service_unavailable(message):
+    return build_error_response(503, message)
+
+
 def internal_server():
     message = "The server encountered an internal \
 error and was unable to complete your request."
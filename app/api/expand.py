@@ -0,0 +1,31 @@
+from flask import request
+from sqlalchemy.orm import selectinload
+from app.models.table_version import VERSIONED
+
+
+def get_expand(expandable) -> tuple:
+    """Return the relationships named in ?expand= and an error, if any."""
+    value = request.args.get('expand')
+    if not value:
+        return (), None
+    fields = tuple(dict.fromkeys(
+        field.strip() for field in value.split(',') if field.strip()
+    ))
+    if not set(fields) <= set(expandable):
+        return None, f"expand aceita apenas: {', '.join(expandable)}"
+    return fields, None
+
+
+def with_expand(query, model, fields):
+    return query.options(
+        *[selectinload(getattr(model, field)) for field in fields]
+    )
+
+
+def request_tables(tables) -> tuple:
+    """`tables` plus the tables of the relationships in ?expand=."""
+    expand = request.args.get('expand', '').split(',')
+    return tuple(tables) + tuple(
+        field for field in dict.fromkeys(f.strip() for f in expand)
+        if field in VERSIONED and field not in tables
+    )
@@ -0,0 +1,66 @@
+import operator
+from datetime import datetime as dt
+from typing import Any
+from flask import request
+from app.models.utils import DATETIME_REGEX
+
+
+# Query arguments used by paginate itself rather than as filters.
+RESERVED = frozenset(['limit', 'after', 'stream', 'expand', 'sort'])
+
+OPERATORS = {
+    'gt': operator.gt,
+    'gte': operator.ge,
+    'lt': operator.lt,
+    'lte': operator.le,
+}
+
+
+def parse_value(column, value: str) -> Any:
+    if value == 'null' and column.nullable:
+        return None
+    python_type = column.type.python_type
+    if python_type is bool:
+        if value not in ('true', 'false'):
+            raise ValueError(value)
+        return value == 'true'
+    if python_type is dt:
+        if DATETIME_REGEX.fullmatch(value) is None:
+            raise ValueError(value)
+        return dt.fromisoformat(value)
+    return python_type(value)
+
+
+def get_filters(model) -> tuple:
+    """Compile the query arguments into SQL criteria on `model`.
+
+    `field=value` tests equality (`null` matches NULL) for the fields in
+    `model.filterable`; datetime fields also take `field__gt`, `__gte`,
+    `__lt` and `__lte`. Returns the criteria and an error, if any.
+    """
+    criteria = []
+    for arg, value in request.args.items():
+        if arg in RESERVED:
+            continue
+        field, _, op = arg.partition('__')
+        if field not in getattr(model, 'filterable', ()):
+            return None, f'filtro inválido: {arg}'
+        column = model.__table__.columns[field]
+        if op and (op not in OPERATORS
+                   or column.type.python_type is not dt):
+            return None, f'filtro inválido: {arg}'
+        try:
+            value = parse_value(column, value)
+        except ValueError:
+            return None, f'valor inválido para {arg}'
+
+        attribute = getattr(model, field)
+        if value is None:
+            if op:
+                return None, f'valor inválido para {arg}'
+            criteria.append(attribute.is_(None))
+        elif op:
+            criteria.append(OPERATORS[op](attribute, value))
+        else:
+            criteria.append(attribute == value)
+    return criteria, None
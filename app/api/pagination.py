@@ -0,0 +1,178 @@
+import json
+import operator
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import datetime as dt
+from typing import Any
+from flask import (
+    Response, current_app, jsonify, request, stream_with_context
+)
+from flask.json import dumps as json_dumps
+from sqlalchemy import and_, or_
+from app.api.errors import bad_request
+from app.api.expand import get_expand, with_expand
+from app.api.filters import get_filters
+from app.serialization import json_column
+
+
+def encode_cursor(values: list) -> str:
+    values = [value.isoformat() if isinstance(value, dt) else value
+              for value in values]
+    raw = json.dumps(values, separators=(',', ':')).encode()
+    return urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str, sort: str, columns: list) -> list:
+    padding = '=' * (-len(cursor) % 4)
+    values = json.loads(urlsafe_b64decode(cursor + padding))
+    if not isinstance(values, list) or len(values) != len(columns) + 1 \
+            or values[0] != sort:
+        raise ValueError(cursor)
+    decoded = []
+    for column, value in zip(columns, values[1:]):
+        python_type = column.type.python_type
+        if python_type is dt and isinstance(value, str):
+            value = dt.fromisoformat(value)
+        elif type(value) != python_type:
+            raise ValueError(cursor)
+        decoded.append(value)
+    return decoded
+
+
+def get_limit() -> Any:
+    max_limit = current_app.config['MAX_PAGE_SIZE']
+    try:
+        limit = int(request.args.get('limit',
+                                     current_app.config['PAGE_SIZE']))
+    except ValueError:
+        return None
+    if limit < 1 or limit > max_limit:
+        return None
+    return limit
+
+
+def get_sort(model, default: str = 'id') -> tuple:
+    """Return the sort argument, the ordering columns and whether the
+    order is descending, or None if the field is not sortable.
+    """
+    sort = request.args.get('sort', default)
+    field = sort[1:] if sort.startswith('-') else sort
+    if field == 'id':
+        return sort, [model.id], sort.startswith('-')
+    if field not in getattr(model, 'sortable', ()):
+        return None
+    return sort, [getattr(model, field), model.id], sort.startswith('-')
+
+
+def after_clause(columns: list, values: list, descending: bool):
+    compare = operator.lt if descending else operator.gt
+    if len(columns) == 1:
+        return compare(columns[0], values[0])
+    return or_(compare(columns[0], values[0]),
+               and_(columns[0] == values[0], compare(columns[1], values[1])))
+
+
+def wants_stream() -> bool:
+    if request.args.get('stream') == '1':
+        return True
+    best = request.accept_mimetypes.best_match(
+        ['application/json', 'application/x-ndjson']
+    )
+    return best == 'application/x-ndjson'
+
+
+def stream(query, serialize):
+    """Stream every row of `query` as newline delimited JSON.
+
+    Rows are fetched in batches of STREAM_BATCH_SIZE, so memory stays
+    bounded no matter how large the collection is.
+    """
+    batch_size = current_app.config['STREAM_BATCH_SIZE']
+
+    def generate():
+        for row in query.yield_per(batch_size):
+            yield json_dumps(serialize(row)) + '\n'
+
+    return Response(stream_with_context(generate()),
+                    mimetype='application/x-ndjson')
+
+
+def paginate(query, model, default_sort: str = 'id'):
+    """Return one page of `query` in keyset order.
+
+    The query arguments may filter on `model.filterable` fields, sort by
+    one of `model.sortable` (with the id as tie breaker) and embed the
+    `model.expandable` relationships. Rows are serialized as
+    `model.fields`. The page starts right after the opaque `after`
+    cursor and the cursor for the following page, if any, goes in the
+    X-Next-Cursor header. With ?stream=1 or Accept:
+    application/x-ndjson every row after the cursor is streamed instead.
+    Without ?sort= rows are ordered by `default_sort`.
+    """
+    criteria, error = get_filters(model)
+    if error:
+        return bad_request(error)
+    query = query.filter(*criteria)
+
+    sorting = get_sort(model, default_sort)
+    if sorting is None:
+        return bad_request(
+            f"sort aceita apenas: "
+            f"{', '.join(('id',) + getattr(model, 'sortable', ()))}"
+        )
+    sort, columns, descending = sorting
+
+    after = request.args.get('after')
+    if after is not None:
+        try:
+            values = decode_cursor(after, sort, columns)
+        except ValueError:
+            return bad_request('cursor inválido')
+        query = query.filter(after_clause(columns, values, descending))
+    query = query.order_by(*[column.desc() if descending else column
+                             for column in columns])
+
+    expand, error = get_expand(getattr(model, 'expandable', ()))
+    if error:
+        return bad_request(error)
+    if expand:
+        query = with_expand(query, model, expand)
+
+        def serialize(row):
+            return row.to_dict(expand)
+
+        def cursor_values(row):
+            return [getattr(row, column.key) for column in columns]
+    else:
+        # Without relationships to embed, select the model's fields as
+        # plain tuples, followed by the raw sort columns for the cursor,
+        # and skip building ORM objects.
+        fields = model.fields
+        query = query.with_entities(
+            *[json_column(getattr(model, field)) for field in fields],
+            *columns
+        )
+
+        def serialize(row):
+            return dict(zip(fields, row))
+
+        def cursor_values(row):
+            return list(row[len(fields):])
+
+    if wants_stream():
+        return stream(query, serialize)
+
+    limit = get_limit()
+    if limit is None:
+        return bad_request(
+            f"limit deve ser um inteiro entre 1 e "
+            f"{current_app.config['MAX_PAGE_SIZE']}"
+        )
+
+    rows = query.limit(limit + 1).all()
+    response = jsonify([serialize(row) for row in rows[:limit]])
+    if len(rows) > limit:
+        last = rows[limit - 1]
+        response.headers['X-Next-Cursor'] = encode_cursor(
+            [sort] + cursor_values(last)
+        )
+    return response
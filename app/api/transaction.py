@@ -0,0 +1,45 @@
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from app.models import db
+from app.api.errors import internal_server
+from app.api import api
+
+
+def mark_written(session=None):
+    """Flag the session for commit after a write that skips the flush."""
+    (session or db.session).info['written'] = True
+
+
+@event.listens_for(Session, 'after_flush')
+def mark_flushed(session, flush_context):
+    mark_written(session)
+
+
+@event.listens_for(Session, 'after_bulk_update')
+@event.listens_for(Session, 'after_bulk_delete')
+def mark_bulk_written(update_context):
+    mark_written(update_context.session)
+
+
+@api.after_request
+def commit_unit_of_work(response):
+    """Commit everything a request wrote exactly once, or roll it back.
+
+    Views and model methods only flush; nothing is committed unless the
+    response is successful.
+    """
+    session = db.session
+    if not (session.info.pop('written', False)
+            or session.new or session.dirty or session.deleted):
+        return response
+
+    if response.status_code >= 400:
+        session.rollback()
+        return response
+
+    try:
+        session.commit()
+    except Exception:
+        session.rollback()
+        return internal_server()
+    return response
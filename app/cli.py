@@ -1,8 +1,17 @@
+import json
+import sys
+import time
 import click
+from datetime import datetime, timedelta
+from flask import current_app
 from flask.cli import with_appcontext
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ClauseElement, Executable
 from app.models import (
-    db, User
+    db, Item, Lending, OverdueLending, Reservation, StatCounter, Thirdparty,
+    User
 )
+from app.models.stat_counter import COUNTERS
 
 @click.command('create_admin')
 @with_appcontext
@@ -20,3 +29,166 @@ def create_admin():
         click.echo("Admin cadastrado com sucesso!")
     except Exception:
         click.echo("Falha ao cadastrar Admin.")
+
+
+@click.command('seed')
+@click.option('--scale', type=click.IntRange(min=1), default=1000,
+              help='Quantidade de empréstimos.')
+@click.option('--seed', 'random_seed', type=int, default=0,
+              help='Semente do gerador aleatório.')
+@click.option('--batch-size', type=click.IntRange(min=1), default=10000,
+              help='Registros por lote de inserção.')
+@with_appcontext
+def seed(scale, random_seed, batch_size):
+    """Fill the database with synthetic rows for scale testing."""
+    from app.seed import seed as seed_rows
+    start = time.perf_counter()
+    try:
+        counts = seed_rows(scale, random_seed, batch_size)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        click.echo("Falha ao gerar dados.")
+        sys.exit(1)
+    for table, count in counts.items():
+        click.echo(f"{table}: {count}")
+    click.echo(f"Dados gerados em {time.perf_counter() - start:.1f}s.")
+
+
+@click.command('scan_overdue')
+@with_appcontext
+def scan_overdue():
+    """Rebuild the snapshot of open lendings past their date_end and
+    recount the dashboard counters.
+    """
+    try:
+        count = OverdueLending.scan()
+        StatCounter.recount(db.session, COUNTERS)
+        db.session.commit()
+        click.echo(f"{count} empréstimos atrasados.")
+    except Exception:
+        db.session.rollback()
+        click.echo("Falha ao verificar empréstimos atrasados.")
+        sys.exit(1)
+
+
+@click.command('run_scheduler')
+@click.option('--interval', type=int, default=None,
+              help='Segundos entre verificações (OVERDUE_SCAN_INTERVAL).')
+@with_appcontext
+def run_scheduler(interval):
+    """Run `scan_overdue` every `interval` seconds until interrupted."""
+    from app.scheduler import overdue_scheduler
+    if interval is None:
+        interval = current_app.config['OVERDUE_SCAN_INTERVAL']
+    if interval <= 0:
+        click.echo("Informe um intervalo maior que zero.")
+        sys.exit(1)
+    click.echo(f"Verificando empréstimos atrasados a cada {interval}s.")
+    try:
+        overdue_scheduler.run(current_app._get_current_object(), interval)
+    except KeyboardInterrupt:
+        overdue_scheduler.stop()
+
+
+class Explain(Executable, ClauseElement):
+    inherit_cache = False
+
+    def __init__(self, statement):
+        self.statement = statement
+
+
+@compiles(Explain, 'sqlite')
+def explain_sqlite(element, compiler, **kwargs):
+    return 'EXPLAIN QUERY PLAN ' + compiler.process(element.statement,
+                                                    **kwargs)
+
+
+@compiles(Explain, 'postgresql')
+def explain_postgresql(element, compiler, **kwargs):
+    return 'EXPLAIN (FORMAT JSON) ' + compiler.process(element.statement,
+                                                       **kwargs)
+
+
+def hot_queries() -> list:
+    now = datetime.utcnow()
+    return [
+        ('get_available_items',
+         Item.query_available().order_by(Item.id).limit(101)),
+        ('get_open_lendings',
+         Lending.query_open().order_by(Lending.id).limit(101)),
+        ('scan_overdue',
+         Lending.query_open().filter(Lending.date_end < now)),
+        ('get_overdue_lendings',
+         OverdueLending.query_lendings()
+         .order_by(Lending.id).limit(101)),
+        ('get_open_reservations',
+         Reservation.query_open()
+         .order_by(Reservation.date_end, Reservation.id).limit(101)),
+        ('create_reservation',
+         Reservation.query_conflicts(now, now + timedelta(hours=1))
+         .limit(1)),
+        ('get_all_items?category_id',
+         Item.query.filter(Item.category_id == 1)),
+        ('get_all_lendings?user_id',
+         Lending.query.filter(Lending.user_id == 1)),
+        ('get_all_lendings?sort=date_start',
+         Lending.query.order_by(Lending.date_start, Lending.id).limit(101)),
+        ('delete_item', Lending.query.filter(Lending.item_id == 1)),
+        ('delete_user', Reservation.query.filter(Reservation.user_id == 1)),
+        ('delete_thirdparty',
+         Lending.query.filter(Lending.thirdparty_id == 1)),
+        ('delete_thirdparty',
+         Reservation.query.filter(Reservation.thirdparty_id == 1)),
+        ('login', User.query.filter_by(email='admin@admin.com')),
+        ('load_logged_in_user', User.query.filter_by(token='token')),
+        ('create_thirdparty',
+         Thirdparty.query.filter_by(email='admin@admin.com')),
+    ]
+
+
+def full_scans_sqlite(query) -> list:
+    rows = db.session.execute(Explain(query.statement))
+    return [detail for _, _, _, detail in rows
+            if detail.startswith('SCAN') and 'INDEX' not in detail]
+
+
+def full_scans_postgresql(query) -> list:
+    db.session.execute(db.text('SET LOCAL enable_seqscan = off'))
+    plan = db.session.execute(Explain(query.statement)).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    scans = []
+    nodes = [plan[0]['Plan']]
+    while nodes:
+        node = nodes.pop()
+        if node['Node Type'] == 'Seq Scan':
+            scans.append(f"Seq Scan on {node['Relation Name']}")
+        nodes.extend(node.get('Plans', []))
+    return scans
+
+
+@click.command('check_indexes')
+@with_appcontext
+def check_indexes():
+    """Fail if the plan of any hot query has a full table scan."""
+    dialect = db.engine.dialect.name
+    if dialect == 'postgresql':
+        full_scans = full_scans_postgresql
+    elif dialect == 'sqlite':
+        full_scans = full_scans_sqlite
+    else:
+        click.echo(f"Banco {dialect} não suportado.")
+        sys.exit(1)
+
+    failed = False
+    for name, query in hot_queries():
+        scans = full_scans(query)
+        if scans:
+            failed = True
+            click.echo(f"{name}: {'; '.join(scans)}")
+        else:
+            click.echo(f"{name}: ok")
+    db.session.rollback()
+    if failed:
+        sys.exit(1)
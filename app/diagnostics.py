@@ -0,0 +1,96 @@
+import os
+import traceback
+from collections import Counter
+from time import perf_counter
+from flask import g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def origin() -> str:
+    """The innermost frame of this app that led to the statement."""
+    for frame in reversed(traceback.extract_stack()):
+        path = os.path.abspath(frame.filename)
+        if path.startswith(APP_DIR) and path != os.path.abspath(__file__):
+            return f'{os.path.relpath(path, os.path.dirname(APP_DIR))}:' \
+                f'{frame.lineno} in {frame.name}'
+    return 'desconhecida'
+
+
+def endpoint() -> str:
+    if has_request_context():
+        return f'{request.method} {request.endpoint}'
+    return 'fora de requisição'
+
+
+class QueryDiagnostics:
+    """Development aid enabled by SQL_DIAGNOSTICS.
+
+    Logs every statement slower than SLOW_QUERY_MS with its parameters
+    and origin, and every request that runs the same statement more than
+    REPEATED_QUERY_LIMIT times, the usual sign of an N+1 query. Bound
+    parameters are logged as is, so keep it off in production.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.slow_query = 0.1
+        self.repeated_limit = 5
+        self.logger = None
+        self._listening = False
+
+    def init_app(self, app):
+        self.enabled = app.config.get('SQL_DIAGNOSTICS', False)
+        self.slow_query = app.config.get('SLOW_QUERY_MS', 100) / 1000
+        self.repeated_limit = app.config.get('REPEATED_QUERY_LIMIT',
+                                             self.repeated_limit)
+        self.logger = app.logger
+        if not self.enabled:
+            return
+        if not self._listening:
+            event.listen(Engine, 'before_cursor_execute',
+                         self.start_statement)
+            event.listen(Engine, 'after_cursor_execute',
+                         self.finish_statement)
+            self._listening = True
+        app.after_request(self.check_repeated)
+
+    def start_statement(self, conn, cursor, statement, parameters, context,
+                        executemany):
+        if self.enabled:
+            conn.info['diagnostics_start'] = perf_counter()
+
+    def finish_statement(self, conn, cursor, statement, parameters, context,
+                         executemany):
+        start = conn.info.pop('diagnostics_start', None)
+        if not self.enabled or start is None:
+            return
+
+        duration = perf_counter() - start
+        if duration >= self.slow_query:
+            self.logger.warning(
+                'consulta lenta (%.1f ms) em %s, %s: %s %r',
+                1000 * duration, endpoint(), origin(), statement, parameters
+            )
+
+        if has_request_context():
+            counts = g.setdefault('statement_counts', Counter())
+            counts[statement] += 1
+            if counts[statement] == self.repeated_limit + 1:
+                g.setdefault('repeated_origins', {})[statement] = origin()
+
+    def check_repeated(self, response):
+        counts = g.pop('statement_counts', None)
+        origins = g.pop('repeated_origins', {})
+        for statement, where in origins.items():
+            self.logger.warning(
+                'consulta repetida %d vezes em %s, %s: %s',
+                counts[statement], endpoint(), where, statement
+            )
+        return response
+
+
+query_diagnostics = QueryDiagnostics()
@@ -0,0 +1,174 @@
+import functools
+import threading
+from bisect import bisect_left
+from time import perf_counter
+from flask import g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+SECONDS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERIES = (1, 2, 5, 10, 20, 50, 100)
+BYTES = (1e3, 1e4, 1e5, 1e6, 1e7)
+
+
+class Histogram:
+    """Prometheus histogram with one series per (method, route)."""
+
+    def __init__(self, name: str, help: str, buckets: tuple):
+        self.name = name
+        self.help = help
+        self.buckets = buckets
+        self._series = {}
+
+    def observe(self, labels: tuple, value: float):
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [0] * (len(self.buckets) + 1) \
+                + [0.0]
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def render(self) -> list:
+        lines = [f'# HELP {self.name} {self.help}',
+                 f'# TYPE {self.name} histogram']
+        for (method, route), series in sorted(self._series.items()):
+            labels = f'method="{method}",route="{escape(route)}"'
+            total = 0
+            for le, count in zip(self.buckets + ('+Inf',), series):
+                total += count
+                lines.append(f'{self.name}_bucket{{{labels},le="{le}"}} '
+                             f'{total}')
+            lines.append(f'{self.name}_sum{{{labels}}} {series[-1]}')
+            lines.append(f'{self.name}_count{{{labels}}} {total}')
+        return lines
+
+
+def escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"') \
+        .replace('\n', '\\n')
+
+
+class RequestMetrics:
+    """Times every request, its SQL statements and its JSON encoding.
+
+    Each response gets a Server-Timing header with the request's figures
+    and the per-route histograms are rendered by `render` in Prometheus'
+    text format. Figures are kept per process.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.histograms = {
+                'duration': Histogram(
+                    'quartermaster_request_duration_seconds',
+                    'Wall time spent handling the request.', SECONDS),
+                'db': Histogram(
+                    'quartermaster_request_db_seconds',
+                    'Time spent executing SQL statements.', SECONDS),
+                'queries': Histogram(
+                    'quartermaster_request_queries',
+                    'SQL statements executed.', QUERIES),
+                'serialize': Histogram(
+                    'quartermaster_request_serialize_seconds',
+                    'Time spent encoding JSON.', SECONDS),
+                'size': Histogram(
+                    'quartermaster_response_size_bytes',
+                    'Response body size.', BYTES),
+            }
+
+    def init_app(self, app):
+        self.reset()
+        app.before_request(start_request)
+        app.after_request(self.finish_request)
+        if hasattr(app, 'json'):
+            app.json.dumps = timed_serialization(app.json.dumps)
+        else:
+            app.json_encoder = timed_encoder(app.json_encoder)
+
+    def finish_request(self, response):
+        timings = g.pop('timings', None)
+        if timings is None:
+            return response
+        duration = perf_counter() - timings['start']
+        response.headers['Server-Timing'] = ', '.join([
+            f'db;dur={1000 * timings["db"]:.2f};'
+            f'desc="{timings["queries"]} queries"',
+            f'serialize;dur={1000 * timings["serialize"]:.2f}',
+            f'total;dur={1000 * duration:.2f}',
+        ])
+
+        rule = request.url_rule.rule if request.url_rule else 'unmatched'
+        labels = (request.method, rule)
+        size = response.calculate_content_length()
+        with self._lock:
+            self.histograms['duration'].observe(labels, duration)
+            self.histograms['db'].observe(labels, timings['db'])
+            self.histograms['queries'].observe(labels, timings['queries'])
+            self.histograms['serialize'].observe(labels,
+                                                 timings['serialize'])
+            if size is not None:
+                self.histograms['size'].observe(labels, size)
+        return response
+
+    def render(self) -> str:
+        with self._lock:
+            lines = []
+            for histogram in self.histograms.values():
+                lines += histogram.render()
+        return '\n'.join(lines) + '\n'
+
+
+def start_request():
+    g.timings = {'start': perf_counter(), 'db': 0.0, 'queries': 0,
+                 'serialize': 0.0}
+
+
+def current_timings():
+    if has_request_context():
+        return g.get('timings')
+    return None
+
+
+def timed_serialization(dumps):
+    @functools.wraps(dumps)
+    def wrapped_dumps(*args, **kwargs):
+        start = perf_counter()
+        try:
+            return dumps(*args, **kwargs)
+        finally:
+            timings = current_timings()
+            if timings is not None:
+                timings['serialize'] += perf_counter() - start
+
+    return wrapped_dumps
+
+
+def timed_encoder(encoder):
+    class TimedJSONEncoder(encoder):
+        encode = timed_serialization(encoder.encode)
+
+    return TimedJSONEncoder
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def start_statement(conn, cursor, statement, parameters, context,
+                    executemany):
+    conn.info['statement_start'] = perf_counter()
+
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def finish_statement(conn, cursor, statement, parameters, context,
+                     executemany):
+    start = conn.info.pop('statement_start', None)
+    timings = current_timings()
+    if timings is not None and start is not None:
+        timings['db'] += perf_counter() - start
+        timings['queries'] += 1
+
+
+request_metrics = RequestMetrics()
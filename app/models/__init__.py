@@ -1,13 +1,22 @@
 from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
+from app.models.passwords import PasswordHasher
+from app.models.token_cache import TokenCache, TokenDenylist
 
 
 db = SQLAlchemy()
 migrate = Migrate()
+passwords = PasswordHasher()
+token_cache = TokenCache()
+token_denylist = TokenDenylist()
 
+from app.models.revoked_token import RevokedToken
+from app.models.table_version import TableVersion
 from app.models.user import User
 from app.models.thirdparty import Thirdparty
 from app.models.category import Category
 from app.models.item import Item
 from app.models.lending import Lending
 from app.models.reservation import Reservation
+from app.models.overdue_lending import OverdueLending
+from app.models.stat_counter import StatCounter
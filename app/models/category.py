@@ -11,20 +11,21 @@ definition = {
     'unique': ['name']
 }
 
+schema = utils.Schema(definition)
+
 
 class Category(db.Model):
+    fields = ('id', 'name', 'description')
+    filterable = ('name',)
+    sortable = ('name',)
+
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(80), unique=True, nullable=False)
     description = db.Column(db.Text)
     items = db.relationship('Item', backref='category', lazy=True)
 
     def to_dict(self) -> dict:
-        obj = {
-            "id": self.id,
-            "name": self.name,
-            "description": self.description
-        }
-        return obj
+        return {field: getattr(self, field) for field in self.fields}
 
     def from_dict(self, data: dict, new: bool = False):
         for field in ['name', 'description']:
@@ -33,5 +34,4 @@ class Category(db.Model):
 
     @staticmethod
     def check_data(data: dict, new: bool = False):
-        error = utils.check_data(data, definition, new)
-        return error
+        return schema.check(data, new)
@@ -1,4 +1,5 @@
 from app.models import db
+from app.models.locking import get_for_update
 import app.models.utils as utils
 
 
@@ -14,8 +15,21 @@ definition = {
     'unique': ['registry']
 }
 
+schema = utils.Schema(definition)
+
 
 class Item(db.Model):
+    fields = ('id', 'registry', 'name', 'description', 'available',
+              'category_id')
+    filterable = ('registry', 'available', 'category_id')
+    sortable = ('name',)
+    __table_args__ = (
+        db.Index('ix_item_name_id', 'name', 'id'),
+        db.Index('ix_item_available_id', 'id',
+                 sqlite_where=db.text('available = 1'),
+                 postgresql_where=db.text('available')),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     registry = db.Column(db.String(32), unique=True, nullable=True)
     name = db.Column(db.String(120), nullable=False)
@@ -25,19 +39,11 @@ class Item(db.Model):
                             db.ForeignKey('category.id',
                                           onupdate='CASCADE',
                                           ondelete='SET NULL'),
-                            nullable=True)
+                            nullable=True, index=True)
     lendings = db.relationship('Lending', backref='item', lazy=True)
 
     def to_dict(self):
-        obj = {
-            "id": self.id,
-            "registry": self.registry,
-            "name": self.name,
-            "description": self.description,
-            "available": self.available,
-            "category_id": self.category_id
-        }
-        return obj
+        return {field: getattr(self, field) for field in self.fields}
 
     def from_dict(self, data):
         for field in ['registry', 'name', 'description', 'category_id',
@@ -45,7 +51,27 @@ class Item(db.Model):
             if field in data:
                 setattr(self, field, data[field])
 
+    @staticmethod
+    def query_available():
+        return Item.query.filter(Item.available)
+
+    @staticmethod
+    def get_for_update(id: int):
+        """Load the item with its row locked until the transaction ends."""
+        return get_for_update(Item, id)
+
+    @staticmethod
+    def set_available(id: int, available: bool) -> bool:
+        """Set `available` with one conditional UPDATE. Return whether the
+        row changed, which concurrent calls can never both observe.
+        """
+        result = db.session.execute(
+            Item.__table__.update().where(Item.id == id)
+            .where(Item.available == (not available))
+            .values(available=available)
+        )
+        return result.rowcount == 1
+
     @staticmethod
     def check_data(data: dict, new: bool = False):
-        error = utils.check_data(data, definition, new)
-        return error
+        return schema.check(data, new)
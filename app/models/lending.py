@@ -1,5 +1,6 @@
 from datetime import datetime as dt
 from app.models import db
+from app.models.locking import get_for_update
 import app.models.utils as utils
 
 
@@ -16,8 +17,28 @@ definition = {
     'unique': []
 }
 
+schema = utils.Schema(definition,
+                      datetimes=('date_start', 'date_end', 'date_return'))
+
 
 class Lending(db.Model):
+    fields = ('id', 'item_id', 'date_start', 'date_end', 'date_return',
+              'user_id', 'thirdparty_id')
+    expandable = ('item', 'user', 'thirdparty')
+    filterable = ('date_start', 'date_end', 'date_return', 'item_id',
+                  'user_id', 'thirdparty_id')
+    sortable = ('date_start', 'date_end')
+    __table_args__ = (
+        db.Index('ix_lending_date_start_id', 'date_start', 'id'),
+        db.Index('ix_lending_date_end_id', 'date_end', 'id'),
+        db.Index('ix_lending_open_id', 'id',
+                 sqlite_where=db.text('date_return IS NULL'),
+                 postgresql_where=db.text('date_return IS NULL')),
+        db.Index('ix_lending_open_date_end', 'date_end',
+                 sqlite_where=db.text('date_return IS NULL'),
+                 postgresql_where=db.text('date_return IS NULL')),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     date_start = db.Column(db.DateTime, nullable=False,
                            default=dt.utcnow)
@@ -27,32 +48,23 @@ class Lending(db.Model):
                         db.ForeignKey('item.id',
                                       onupdate='CASCADE',
                                       ondelete='SET NULL'),
-                        nullable=True)
+                        nullable=True, index=True)
     user_id = db.Column(db.Integer,
                         db.ForeignKey('user.id',
                                       onupdate='CASCADE',
                                       ondelete='SET NULL'),
-                        nullable=True)
+                        nullable=True, index=True)
     thirdparty_id = db.Column(db.Integer,
                               db.ForeignKey('thirdparty.id',
                                             onupdate='CASCADE',
                                             ondelete='SET NULL'),
-                              nullable=True)
+                              nullable=True, index=True)
 
-    def to_dict(self):
-        obj = {
-            "id": self.id,
-            "item_id": self.item_id,
-            "date_start": self.date_start.isoformat(timespec='minutes'),
-            "date_end": self.date_end.isoformat(timespec='minutes'),
-            "date_return": self.date_return,
-            "user_id": self.user_id,
-            "thirdparty_id": self.thirdparty_id
-        }
-        if self.date_return:
-            obj['date_return'] = self.date_return.isoformat(timespec='minutes')
-        else:
-            obj['date_return'] = None
+    def to_dict(self, expand=()):
+        obj = {field: getattr(self, field) for field in self.fields}
+        for field in expand:
+            related = getattr(self, field)
+            obj[field] = related.to_dict() if related else None
         return obj
 
     def from_dict(self, data):
@@ -61,12 +73,20 @@ class Lending(db.Model):
             if field in data:
                 setattr(self, field, data[field])
 
+    @staticmethod
+    def query_open():
+        return Lending.query.filter(Lending.date_return == None)
+
+    @staticmethod
+    def get_for_update(id: int):
+        """Load the lending with its row locked until the transaction
+        ends.
+        """
+        return get_for_update(Lending, id)
+
     @staticmethod
     def check_data(data: dict, new: bool = False):
-        error = utils.check_data(data, definition, new) \
-            or utils.check_datetime(data, 'date_start') \
-            or utils.check_datetime(data, 'date_end') \
-            or utils.check_datetime(data, 'date_return')
+        error = schema.check(data, new)
         if 'date_start' in data \
                 and 'date_end' in data \
                 and data['date_end'] <= data['date_start']:
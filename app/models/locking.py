@@ -0,0 +1,35 @@
+import zlib
+from app.models import db
+
+
+def get_for_update(model, id: int):
+    """Load the `model` row `id` locked until the transaction ends.
+
+    SQLite ignores FOR UPDATE and pysqlite opens no transaction for a
+    SELECT, so there a no-op UPDATE of the row takes the database write
+    lock before the row is read.
+    """
+    if db.engine.dialect.name == 'sqlite':
+        db.session.execute(
+            model.__table__.update().where(model.id == id)
+            .values(id=model.id)
+        )
+    return model.query.filter_by(id=id).with_for_update() \
+        .populate_existing().first()
+
+
+def lock_table(model):
+    """Serialize the transactions that lock `model`'s table until they end.
+
+    PostgreSQL takes an advisory lock keyed by the table name, which does
+    not block its readers or other writers; SQLite has a single write
+    lock, taken by an UPDATE that matches no row.
+    """
+    table = model.__table__
+    if db.engine.dialect.name == 'postgresql':
+        key = zlib.crc32(table.name.encode())
+        db.session.query(db.func.pg_advisory_xact_lock(key)).scalar()
+    elif db.engine.dialect.name == 'sqlite':
+        db.session.execute(
+            table.update().where(model.id == None).values(id=model.id)
+        )
@@ -0,0 +1,42 @@
+from datetime import datetime as dt
+from app.models import db
+from app.models.lending import Lending
+from app.models.table_version import TableVersion
+
+
+class OverdueLending(db.Model):
+    """Snapshot of the open lendings past their date_end, rebuilt by
+    `scan`. Lendings returned since the last scan are still listed, so
+    readers join back to lending to drop them.
+    """
+    lending_id = db.Column(db.Integer,
+                           db.ForeignKey('lending.id',
+                                         onupdate='CASCADE',
+                                         ondelete='CASCADE'),
+                           primary_key=True)
+    date_end = db.Column(db.DateTime, nullable=False)
+
+    @staticmethod
+    def scan(now=None) -> int:
+        """Replace the snapshot with the result of one range query over
+        the open lendings' date_end index. Does not commit.
+        """
+        now = now or dt.utcnow()
+        overdue = db.session.query(Lending.id, Lending.date_end).filter(
+            Lending.date_return == None,
+            Lending.date_end < now
+        )
+        db.session.execute(OverdueLending.__table__.delete())
+        result = db.session.execute(
+            OverdueLending.__table__.insert().from_select(
+                ['lending_id', 'date_end'], overdue.statement
+            )
+        )
+        TableVersion.bump(db.session, ['overdue_lending'])
+        return result.rowcount
+
+    @staticmethod
+    def query_lendings():
+        return Lending.query_open().join(
+            OverdueLending, OverdueLending.lending_id == Lending.id
+        )
@@ -0,0 +1,132 @@
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from werkzeug.security import check_password_hash, generate_password_hash
+
+try:
+    import fcntl
+except ImportError:  # not POSIX, so slots can only be counted per process
+    fcntl = None
+
+
+class PasswordHasherBusy(Exception):
+    pass
+
+
+class LocalSlots:
+    """`size` slots shared by the threads of one process."""
+
+    def __init__(self, size: int):
+        self._semaphore = threading.BoundedSemaphore(size)
+
+    def acquire(self):
+        return True if self._semaphore.acquire(blocking=False) else None
+
+    def release(self, slot):
+        self._semaphore.release()
+
+
+class FileSlots:
+    """`size` slots shared by every process using `directory`, one lock
+    file each. Record locks belong to a process, so the pool processes it
+    forks never hold them and the system frees the slots of a process that
+    dies. Threads of one process are told apart by `_held`.
+    """
+
+    def __init__(self, directory: str, size: int):
+        self.directory = directory
+        self.size = size
+        self._held = set()
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def acquire(self):
+        with self._lock:
+            for index in range(self.size):
+                if index in self._held:
+                    continue
+                file = open(os.path.join(self.directory, f'{index}.lock'),
+                            'a')
+                try:
+                    fcntl.lockf(file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except OSError:
+                    file.close()
+                    continue
+                self._held.add(index)
+                return index, file
+        return None
+
+    def release(self, slot):
+        index, file = slot
+        with self._lock:
+            file.close()
+            self._held.discard(index)
+
+
+class PasswordHasher:
+    """Hash and check passwords in a bounded process pool.
+
+    Each worker process owns a pool of `pool_size` processes, created on
+    first use. At most `queue_size` hashes are in flight across all the
+    workers sharing the app's instance folder; beyond that, PasswordHasherBusy
+    is raised at once. With `pool_size` 0 hashing runs inline.
+    """
+
+    def __init__(self, method: str = 'pbkdf2:sha256',
+                 iterations: int = 260000, pool_size: int = 0,
+                 queue_size: int = 16):
+        self.method = method
+        self.iterations = iterations
+        self.pool_size = pool_size
+        self.queue_size = queue_size
+        self._pool = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self._slots = LocalSlots(queue_size)
+
+    def init_app(self, app):
+        self.method = app.config.get('PASSWORD_METHOD', self.method)
+        self.iterations = app.config.get('PASSWORD_ITERATIONS',
+                                         self.iterations)
+        self.pool_size = app.config.get('PASSWORD_POOL_SIZE',
+                                        self.pool_size)
+        self.queue_size = app.config.get('PASSWORD_QUEUE_SIZE',
+                                         self.queue_size)
+        if fcntl is None:
+            self._slots = LocalSlots(self.queue_size)
+        else:
+            self._slots = FileSlots(
+                os.path.join(app.instance_path, 'password-slots'),
+                self.queue_size
+            )
+
+    @property
+    def full_method(self) -> str:
+        return f'{self.method}:{self.iterations}'
+
+    def get_pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None or self._pid != os.getpid():
+                self._pool = ProcessPoolExecutor(max_workers=self.pool_size)
+                self._pid = os.getpid()
+            return self._pool
+
+    def run(self, func, *args):
+        if self.pool_size <= 0:
+            return func(*args)
+        slot = self._slots.acquire()
+        if slot is None:
+            raise PasswordHasherBusy()
+        try:
+            return self.get_pool().submit(func, *args).result()
+        finally:
+            self._slots.release(slot)
+
+    def hash(self, password: str) -> str:
+        return self.run(generate_password_hash, password, self.full_method)
+
+    def verify(self, pwhash: str, password: str) -> bool:
+        return self.run(check_password_hash, pwhash, password)
+
+    def needs_rehash(self, pwhash: str) -> bool:
+        return pwhash.split('$', 1)[0] != self.full_method
@@ -0,0 +1,86 @@
+import threading
+from time import perf_counter
+from sqlalchemy.exc import TimeoutError
+from sqlalchemy.pool import QueuePool
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that records how long checkouts wait and how often they
+    go past pool_size or time out.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.overflows = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self._metrics_lock = threading.Lock()
+
+    def connect(self):
+        start = perf_counter()
+        try:
+            connection = super().connect()
+        except TimeoutError:
+            with self._metrics_lock:
+                self.timeouts += 1
+            raise
+        wait = perf_counter() - start
+        with self._metrics_lock:
+            self.checkouts += 1
+            self.wait_total += wait
+            self.wait_max = max(self.wait_max, wait)
+            if self.checkedout() > self.size():
+                self.overflows += 1
+        return connection
+
+    def metrics(self) -> dict:
+        with self._metrics_lock:
+            return {
+                'checkouts': self.checkouts,
+                'overflows': self.overflows,
+                'timeouts': self.timeouts,
+                'wait_avg_ms': 1000 * self.wait_total / self.checkouts
+                if self.checkouts else None,
+                'wait_max_ms': 1000 * self.wait_max
+            }
+
+
+def engine_options(config) -> dict:
+    """SQLALCHEMY_ENGINE_OPTIONS from the DB_* settings. SQLite keeps
+    the pool Flask-SQLAlchemy picks for it.
+    """
+    options = {
+        'pool_pre_ping': config['DB_POOL_PRE_PING'],
+        'pool_recycle': config['DB_POOL_RECYCLE'],
+    }
+    uri = config['SQLALCHEMY_DATABASE_URI']
+    if uri.startswith('sqlite'):
+        return options
+
+    options.update(
+        poolclass=InstrumentedQueuePool,
+        pool_size=config['DB_POOL_SIZE'],
+        max_overflow=config['DB_MAX_OVERFLOW'],
+        pool_timeout=config['DB_POOL_TIMEOUT'],
+    )
+    if config['DB_STATEMENT_TIMEOUT'] and uri.startswith('postgres'):
+        options['connect_args'] = {
+            'options': f"-c statement_timeout={config['DB_STATEMENT_TIMEOUT']}"
+        }
+    return options
+
+
+def pool_stats(pool) -> dict:
+    stats = {'pool': type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        stats.update(
+            size=pool.size(),
+            checked_out=pool.checkedout(),
+            checked_in=pool.checkedin(),
+            overflow=pool.overflow()
+        )
+    if isinstance(pool, InstrumentedQueuePool):
+        stats.update(pool.metrics())
+    return stats
@@ -1,4 +1,6 @@
+from datetime import datetime as dt, timedelta
 from app.models import db
+from app.models.locking import lock_table
 import app.models.utils as utils
 
 
@@ -15,8 +17,24 @@ definition = {
     'unique': []
 }
 
+schema = utils.Schema(definition, datetimes=('date_start', 'date_end'))
+
 
 class Reservation(db.Model):
+    # EXCLUDE constraint added on PostgreSQL by migration 2d7c4b9e1f83.
+    period_constraint = 'reservation_period_excl'
+
+    fields = ('id', 'name', 'description', 'date_start', 'date_end',
+              'user_id', 'thirdparty_id')
+    expandable = ('user', 'thirdparty')
+    filterable = ('date_start', 'date_end', 'user_id', 'thirdparty_id')
+    sortable = ('date_start', 'date_end')
+    __table_args__ = (
+        db.Index('ix_reservation_date_end_date_start',
+                 'date_end', 'date_start'),
+        db.Index('ix_reservation_date_start_id', 'date_start', 'id'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(120), nullable=False)
     description = db.Column(db.Text)
@@ -26,24 +44,18 @@ class Reservation(db.Model):
                         db.ForeignKey('user.id',
                                       onupdate='CASCADE',
                                       ondelete='SET NULL'),
-                        nullable=True)
+                        nullable=True, index=True)
     thirdparty_id = db.Column(db.Integer,
                               db.ForeignKey('thirdparty.id',
                                             onupdate='CASCADE',
                                             ondelete='SET NULL'),
-                              nullable=True)
-
-    def to_dict(self):
-        obj = {
-            "id": self.id,
-            "name": self.name,
-            "description": self.description,
-            "date_start": self.date_start.isoformat(timespec='minutes'),
-            "date_end": self.date_end.isoformat(timespec='minutes'),
-            "user_id": self.user_id,
-            "thirdparty_id": self.thirdparty_id
-        }
-        print(type(self.date_start))
+                              nullable=True, index=True)
+
+    def to_dict(self, expand=()):
+        obj = {field: getattr(self, field) for field in self.fields}
+        for field in expand:
+            related = getattr(self, field)
+            obj[field] = related.to_dict() if related else None
         return obj
 
     def from_dict(self, data):
@@ -52,11 +64,72 @@ class Reservation(db.Model):
             if field in data:
                 setattr(self, field, data[field])
 
+    @staticmethod
+    def query_open():
+        return Reservation.query.filter(Reservation.date_end >= dt.utcnow())
+
+    @staticmethod
+    def query_conflicts(date_start, date_end, exclude_id=None):
+        if db.engine.dialect.name == 'postgresql':
+            overlaps = db.func.tsrange(
+                Reservation.date_start, Reservation.date_end
+            ).op('&&')(db.func.tsrange(date_start, date_end))
+        else:
+            overlaps = db.and_(Reservation.date_end > date_start,
+                               Reservation.date_start < date_end)
+        query = Reservation.query.filter(overlaps)
+        if exclude_id is not None:
+            query = query.filter(Reservation.id != exclude_id)
+        return query
+
+    @staticmethod
+    def find_conflict(date_start, date_end, exclude_id=None):
+        """Return the first reservation overlapping [date_start, date_end).
+
+        Other conflict checks wait until the transaction ends, so no
+        overlapping reservation can be written between the check and the
+        caller's write.
+        """
+        lock_table(Reservation)
+        return Reservation.query_conflicts(date_start, date_end,
+                                           exclude_id).first()
+
+    @staticmethod
+    def availability(date_from, date_to, granularity=timedelta(minutes=1)):
+        """Return the busy and free intervals inside [date_from, date_to).
+
+        Busy intervals are widened to multiples of `granularity` and merged
+        in a single sweep over the reservations sorted by date_start.
+        """
+        rows = db.session.query(
+            Reservation.date_start, Reservation.date_end
+        ).filter(
+            Reservation.date_end > date_from,
+            Reservation.date_start < date_to
+        ).order_by(Reservation.date_start)
+
+        busy = []
+        for start, end in rows:
+            start = max(start - (start - dt.min) % granularity, date_from)
+            end = min(end + (dt.min - end) % granularity, date_to)
+            if busy and start <= busy[-1][1]:
+                busy[-1][1] = max(busy[-1][1], end)
+            else:
+                busy.append([start, end])
+
+        free = []
+        cursor = date_from
+        for start, end in busy:
+            if start > cursor:
+                free.append([cursor, start])
+            cursor = end
+        if cursor < date_to:
+            free.append([cursor, date_to])
+        return busy, free
+
     @staticmethod
     def check_data(data: dict, new: bool = False):
-        error = utils.check_data(data, definition, new) \
-            or utils.check_datetime(data, 'date_start') \
-            or utils.check_datetime(data, 'date_end')
+        error = schema.check(data, new)
         if 'date_start' in data \
                 and 'date_end' in data \
                 and data['date_end'] <= data['date_start']:
@@ -0,0 +1,42 @@
+from datetime import datetime
+from app.models import db, token_denylist
+
+
+class RevokedToken(db.Model):
+    jti = db.Column(db.String(32), primary_key=True)
+    exp = db.Column(db.DateTime, nullable=False)
+
+    @staticmethod
+    def revoke(jti, exp):
+        RevokedToken.query.filter(
+            RevokedToken.exp < datetime.utcnow()
+        ).delete()
+        db.session.add(RevokedToken(jti=jti, exp=exp))
+        token_denylist.add(jti)
+
+    @staticmethod
+    def revoke_in_flush(connection, jti, exp):
+        """`revoke` for mapper events, which have to write through the
+        flush's connection.
+        """
+        table = RevokedToken.__table__
+        connection.execute(
+            table.delete().where(table.c.exp < datetime.utcnow())
+        )
+        revoked = connection.execute(
+            table.select().where(table.c.jti == jti)
+        ).first()
+        if revoked is None:
+            connection.execute(table.insert().values(jti=jti, exp=exp))
+        token_denylist.add(jti)
+
+    @staticmethod
+    def is_revoked(jti):
+        return token_denylist.contains(jti, RevokedToken.active_jtis)
+
+    @staticmethod
+    def active_jtis():
+        query = db.session.query(RevokedToken.jti).filter(
+            RevokedToken.exp >= datetime.utcnow()
+        )
+        return [jti for jti, in query]
@@ -0,0 +1,72 @@
+import re
+from app.models import db
+from app.models.category import Category
+from app.models.item import Item
+from app.models.thirdparty import Thirdparty
+
+
+# On SQLite the search_index FTS5 table stores every document under
+# rowid = id * 4 + kind, with the table name in its kind column, kept in
+# sync by triggers. On PostgreSQL each table has a GIN index over the
+# same to_tsvector expression used below.
+DOCUMENTS = {
+    Item: "coalesce(name, '') || ' ' || coalesce(description, '') "
+          "|| ' ' || coalesce(registry, '')",
+    Category: "name",
+    Thirdparty: "first_name || ' ' || last_name || ' ' || email",
+}
+
+TERM_REGEX = re.compile(r'\w+')
+
+
+def search_terms(q: str) -> list:
+    return TERM_REGEX.findall(q)
+
+
+def search_sqlite(terms: list, limit: int) -> dict:
+    body = ' '.join(f'"{term}"*' for term in terms)
+    ids = {}
+    for model in DOCUMENTS:
+        rows = db.session.execute(db.text(
+            'SELECT rowid / 4 FROM search_index '
+            'WHERE search_index MATCH :query ORDER BY rank LIMIT :limit'
+        ), {'query': f'kind : {model.__table__.name} AND body : ({body})',
+            'limit': limit})
+        ids[model] = [id for id, in rows]
+    return ids
+
+
+def search_postgresql(terms: list, limit: int) -> dict:
+    query = ' & '.join(f'{term}:*' for term in terms)
+    ids = {}
+    for model, document in DOCUMENTS.items():
+        vector = f"to_tsvector('simple', {document})"
+        rows = db.session.execute(db.text(
+            f'SELECT id FROM "{model.__table__.name}" '
+            f"WHERE {vector} @@ to_tsquery('simple', :query) "
+            f"ORDER BY ts_rank({vector}, to_tsquery('simple', :query)) DESC "
+            f'LIMIT :limit'
+        ), {'query': query, 'limit': limit})
+        ids[model] = [id for id, in rows]
+    return ids
+
+
+def search(q: str, limit: int = 20) -> dict:
+    """Return up to `limit` items, categories and thirdparties matching
+    every word of `q` as a prefix, best matches first.
+    """
+    terms = search_terms(q)
+    if not terms:
+        return {model: [] for model in DOCUMENTS}
+    if db.engine.dialect.name == 'postgresql':
+        ids = search_postgresql(terms, limit)
+    else:
+        ids = search_sqlite(terms, limit)
+
+    results = {}
+    for model, model_ids in ids.items():
+        rows = {row.id: row for row in
+                model.query.filter(model.id.in_(model_ids))} \
+            if model_ids else {}
+        results[model] = [rows[id] for id in model_ids if id in rows]
+    return results
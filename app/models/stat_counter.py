@@ -0,0 +1,127 @@
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import get_history
+from app.models import db
+from app.models.item import Item
+from app.models.lending import Lending
+
+
+# counter name: (model, attribute, whether a value counts, the same test
+# in SQL). New items have available unset until the column default.
+COUNTERS = {
+    'available_items': (Item, 'available', lambda value: value is not False,
+                        Item.available),
+    'open_lendings': (Lending, 'date_return', lambda value: value is None,
+                      Lending.date_return == None),
+}
+
+
+class StatCounter(db.Model):
+    """A row count kept up to date by the transactions that change it."""
+    name = db.Column(db.String(64), primary_key=True)
+    value = db.Column(db.Integer, nullable=False, default=0)
+
+    @staticmethod
+    def current() -> dict:
+        return dict(db.session.query(StatCounter.name, StatCounter.value))
+
+    @staticmethod
+    def add(session, deltas: dict):
+        """Add `deltas` once, when the transaction commits."""
+        pending = session.info.setdefault('counter_deltas', {})
+        for name, delta in deltas.items():
+            pending[name] = pending.get(name, 0) + delta
+
+    @staticmethod
+    def recount(session, tables):
+        """Count the counters of `tables` again when the transaction
+        commits, replacing their pending deltas.
+        """
+        session.info.setdefault('counter_recounts', set()).update(
+            name for name, (model, _, _, _) in COUNTERS.items()
+            if name in tables or model.__table__.name in tables
+        )
+
+
+def counter_deltas(session) -> tuple:
+    """Return how much each counter changes with the pending flush and the
+    counters whose previous values are unknown and must be recounted.
+    """
+    deltas = {}
+    recount = set()
+    for name, (model, key, counts, _) in COUNTERS.items():
+        delta = 0
+        for obj in session.new:
+            if isinstance(obj, model) and counts(getattr(obj, key)):
+                delta += 1
+        for obj in session.dirty | session.deleted:
+            if not isinstance(obj, model):
+                continue
+            history = get_history(obj, key)
+            if history.deleted:
+                before = history.deleted[0]
+            elif history.unchanged:
+                before = history.unchanged[0]
+            else:
+                recount.add(name)
+                continue
+            after = None if obj in session.deleted else getattr(obj, key)
+            delta += int(obj not in session.deleted and counts(after)) \
+                - int(counts(before))
+        deltas[name] = delta
+    return deltas, recount
+
+
+@event.listens_for(Session, 'before_flush')
+def collect_counter_deltas(session, flush_context, instances):
+    session.info['flush_counter_deltas'] = counter_deltas(session)
+
+
+@event.listens_for(Session, 'after_flush')
+def record_counter_deltas(session, flush_context):
+    deltas, recount = session.info.pop('flush_counter_deltas',
+                                       ({}, set()))
+    StatCounter.add(session, deltas)
+    if recount:
+        StatCounter.recount(session, recount)
+
+
+@event.listens_for(Session, 'before_commit')
+def apply_counter_deltas(session):
+    """Write every pending counter in name order, so concurrent
+    transactions lock the rows in the same order.
+    """
+    session.flush()
+    deltas = session.info.pop('counter_deltas', {})
+    recounts = session.info.pop('counter_recounts', set())
+    table = StatCounter.__table__
+    for name in sorted(set(deltas) | recounts):
+        if name in recounts:
+            # Lock the row before counting: a transaction that commits a
+            # delta meanwhile either did so before the count sees its rows
+            # or waits and adds it on top of the new value.
+            session.execute(table.update().where(table.c.name == name)
+                            .values(value=table.c.value))
+            model, _, _, criterion = COUNTERS[name]
+            value = session.query(db.func.count(model.id)) \
+                .filter(criterion).scalar()
+        elif deltas[name]:
+            value = table.c.value + deltas[name]
+        else:
+            continue
+        session.execute(
+            table.update().where(table.c.name == name).values(value=value)
+        )
+
+
+@event.listens_for(Session, 'after_rollback')
+def forget_counter_deltas(session):
+    session.info.pop('counter_deltas', None)
+    session.info.pop('counter_recounts', None)
+
+
+@event.listens_for(Session, 'after_bulk_update')
+@event.listens_for(Session, 'after_bulk_delete')
+def recount_bulk_table(update_context):
+    StatCounter.recount(update_context.session,
+                        [update_context.mapper.local_table.name])
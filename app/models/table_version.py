@@ -0,0 +1,85 @@
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from app.models import db
+
+
+VERSIONED = frozenset([
+    'category', 'item', 'lending', 'overdue_lending', 'reservation',
+    'thirdparty', 'user'
+])
+
+# Tables whose rows change through ON DELETE SET NULL when a row of the
+# key table is deleted.
+CASCADES = {
+    'category': ['item'],
+    'item': ['lending'],
+    'lending': ['overdue_lending'],
+    'user': ['lending', 'reservation'],
+    'thirdparty': ['lending', 'reservation'],
+}
+
+
+class TableVersion(db.Model):
+    """A counter per table, bumped in the same transaction as each write."""
+    name = db.Column(db.String(64), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+
+    @staticmethod
+    def bump(session, names):
+        """Bump `names` once, when the transaction commits."""
+        session.info.setdefault('bumped_tables', set()).update(
+            name for name in names if name in VERSIONED
+        )
+
+    @staticmethod
+    def current(names) -> dict:
+        rows = db.session.query(TableVersion.name, TableVersion.version) \
+            .filter(TableVersion.name.in_(names))
+        return dict(rows)
+
+
+def written_tables(session) -> set:
+    names = {obj.__table__.name for obj in session.new}
+    names.update(obj.__table__.name for obj in session.dirty
+                 if session.is_modified(obj))
+    for obj in session.deleted:
+        names.add(obj.__table__.name)
+        names.update(CASCADES.get(obj.__table__.name, []))
+    return names
+
+
+@event.listens_for(Session, 'before_commit')
+def bump_committed_tables(session):
+    """Update every bumped row in name order, so concurrent transactions
+    lock them in the same order.
+    """
+    session.flush()
+    table = TableVersion.__table__
+    for name in sorted(session.info.pop('bumped_tables', ())):
+        session.execute(
+            table.update().where(table.c.name == name)
+            .values(version=table.c.version + 1)
+        )
+
+
+@event.listens_for(Session, 'after_rollback')
+def forget_bumped_tables(session):
+    session.info.pop('bumped_tables', None)
+
+
+@event.listens_for(Session, 'after_flush')
+def bump_flushed_tables(session, flush_context):
+    TableVersion.bump(session, written_tables(session))
+
+
+@event.listens_for(Session, 'after_bulk_update')
+def bump_bulk_updated_table(update_context):
+    TableVersion.bump(update_context.session,
+                      [update_context.mapper.local_table.name])
+
+
+@event.listens_for(Session, 'after_bulk_delete')
+def bump_bulk_deleted_table(delete_context):
+    name = delete_context.mapper.local_table.name
+    TableVersion.bump(delete_context.session,
+                      [name] + CASCADES.get(name, []))
@@ -13,8 +13,17 @@ definition = {
     'unique': ['email']
 }
 
+schema = utils.Schema(definition,
+                      names=('first_name', 'last_name'),
+                      emails=('email',),
+                      phones=('phone',))
+
 
 class Thirdparty(db.Model):
+    fields = ('id', 'first_name', 'last_name', 'email', 'phone')
+    filterable = ('email',)
+    sortable = ('email',)
+
     id = db.Column(db.Integer, primary_key=True)
     first_name = db.Column(db.String(120), nullable=False)
     last_name = db.Column(db.String(120), nullable=False)
@@ -32,14 +41,7 @@ class Thirdparty(db.Model):
     )
 
     def to_dict(self):
-        obj = {
-            "id": self.id,
-            "first_name": self.first_name,
-            "last_name": self.last_name,
-            "email": self.email,
-            "phone": self.phone
-        }
-        return obj
+        return {field: getattr(self, field) for field in self.fields}
 
     def from_dict(self, data):
         for field in ['first_name', 'last_name', 'email', 'phone']:
@@ -48,9 +50,4 @@ class Thirdparty(db.Model):
 
     @staticmethod
     def check_data(data: dict, new: bool = False):
-        error = utils.check_data(data, definition, new) \
-            or utils.check_name(data, 'first_name') \
-            or utils.check_name(data, 'last_name') \
-            or utils.check_email(data, 'email') \
-            or utils.check_phone(data, 'phone')
-        return error
+        return schema.check(data, new)
@@ -0,0 +1,103 @@
+import threading
+from collections import OrderedDict, namedtuple
+from hashlib import sha256
+from time import monotonic
+
+
+TokenIdentity = namedtuple('TokenIdentity',
+                           ['id', 'admin', 'token_exp', 'jti'],
+                           defaults=[None])
+
+
+def token_key(token: str) -> str:
+    """The id under which an opaque token is recorded in revoked_token."""
+    return sha256(token.encode()).hexdigest()[:32]
+
+
+class TokenCache:
+    """Bounded LRU of token -> TokenIdentity with a time to live.
+
+    The cache is per process. Writes that change a token's identity record
+    it in revoked_token, and entries found there are looked up again, so
+    the other workers notice within DENYLIST_REFRESH seconds.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.maxsize = app.config.get('TOKEN_CACHE_SIZE', self.maxsize)
+        self.ttl = app.config.get('TOKEN_CACHE_TTL', self.ttl)
+        self.clear()
+
+    def get(self, token: str):
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                return None
+            identity, expires_at = entry
+            if expires_at <= monotonic():
+                del self._entries[token]
+                return None
+            self._entries.move_to_end(token)
+            return identity
+
+    def set(self, token: str, identity: TokenIdentity):
+        if self.maxsize <= 0:
+            return identity
+        with self._lock:
+            self._entries[token] = (identity, monotonic() + self.ttl)
+            self._entries.move_to_end(token)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return identity
+
+    def discard(self, token: str):
+        if token is None:
+            return
+        with self._lock:
+            self._entries.pop(token, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class TokenDenylist:
+    """Per-process copy of the revoked token ids.
+
+    The copy is reloaded through `load` at most every `refresh` seconds,
+    so checking a token costs one query per interval instead of one per
+    request.
+    """
+
+    def __init__(self, refresh: float = 5):
+        self.refresh = refresh
+        self._jtis = frozenset()
+        self._loaded_at = None
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.refresh = app.config.get('DENYLIST_REFRESH', self.refresh)
+        self.clear()
+
+    def contains(self, jti: str, load) -> bool:
+        now = monotonic()
+        with self._lock:
+            if self._loaded_at is None \
+                    or now - self._loaded_at >= self.refresh:
+                self._jtis = frozenset(load())
+                self._loaded_at = now
+            return jti in self._jtis
+
+    def add(self, jti: str):
+        with self._lock:
+            self._jtis = self._jtis | {jti}
+
+    def clear(self):
+        with self._lock:
+            self._jtis = frozenset()
+            self._loaded_at = None
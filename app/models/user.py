@@ -2,11 +2,17 @@ import os
 import jwt
 from secrets import token_urlsafe
 from datetime import datetime, timedelta
-from werkzeug.security import generate_password_hash, check_password_hash
-from app.models import db
+from flask import current_app
+from sqlalchemy import event
+from sqlalchemy.orm.attributes import get_history
+from app.models import db, passwords, token_cache
+from app.models.revoked_token import RevokedToken
+from app.models.token_cache import TokenIdentity, token_key
 import app.models.utils as utils
 
 
+DEFAULT_PASSWORD = 'abcdef'
+
 definition = {
     'types': {
         'first_name': [str],
@@ -21,8 +27,16 @@ definition = {
     'unique': ['email', 'token']
 }
 
+schema = utils.Schema(definition,
+                      names=('first_name', 'last_name'),
+                      emails=('email',))
+
 
 class User(db.Model):
+    fields = ('id', 'first_name', 'last_name', 'email', 'admin')
+    filterable = ('email', 'admin')
+    sortable = ('email',)
+
     id = db.Column(db.Integer, primary_key=True)
     first_name = db.Column(db.String(120), nullable=False)
     last_name = db.Column(db.String(120), nullable=False)
@@ -39,11 +53,17 @@ class User(db.Model):
                                lazy=True)
 
     def set_password(self, password):
-        self.password = generate_password_hash(password)
-        db.session.commit()
+        self.password = passwords.hash(password)
 
     def check_password(self, password):
-        return check_password_hash(self.password, password)
+        return passwords.verify(self.password, password)
+
+    def password_needs_rehash(self):
+        return passwords.needs_rehash(self.password)
+
+    @staticmethod
+    def default_password_hash():
+        return passwords.hash(DEFAULT_PASSWORD)
 
     def get_token(self, expires_in=3600):
         now = datetime.utcnow()
@@ -52,46 +72,102 @@ class User(db.Model):
                 and self.token_exp > now + timedelta(seconds=60):
             return self.token
 
+        token_cache.discard(self.token)
         self.token = token_urlsafe(32)
 
         self.token_exp = now + timedelta(seconds=expires_in)
-        db.session.commit()
         return self.token
 
+    def get_jwt(self, expires_in=900):
+        now = datetime.utcnow()
+        token = jwt.encode({
+            'sub': str(self.id),
+            'admin': self.admin,
+            'iat': now,
+            'exp': now + timedelta(seconds=expires_in),
+            'jti': token_urlsafe(16)
+        }, current_app.config['SECRET_KEY'], algorithm='HS256')
+        if isinstance(token, bytes):
+            token = token.decode()
+        return token
+
+    @staticmethod
+    def check_jwt(token):
+        try:
+            payload = jwt.decode(token, current_app.config['SECRET_KEY'],
+                                 algorithms=['HS256'])
+        except jwt.InvalidTokenError:
+            return None
+        if RevokedToken.is_revoked(payload['jti']):
+            return None
+        return TokenIdentity(int(payload['sub']), payload['admin'],
+                             datetime.utcfromtimestamp(payload['exp']),
+                             payload['jti'])
+
     def revoke_token(self):
+        token_cache.discard(self.token)
         self.token = None
         self.token_exp = datetime.utcnow() - timedelta(seconds=1)
-        db.session.commit()
 
     @staticmethod
     def check_token(token):
-        user = User.query.filter_by(token=token).first()
-        if user and user.token == token:
-            return user
-        return None
+        identity = token_cache.get(token)
+        if identity is not None and \
+                RevokedToken.is_revoked(token_key(token)):
+            token_cache.discard(token)
+            identity = None
+        if identity is None:
+            user = User.query.filter_by(token=token).first()
+            if user is None or user.token != token:
+                return None
+            identity = token_cache.set(
+                token, TokenIdentity(user.id, user.admin, user.token_exp)
+            )
+        if identity.token_exp is None \
+                or identity.token_exp <= datetime.utcnow():
+            token_cache.discard(token)
+            return None
+        return identity
 
     def to_dict(self):
-        obj = {
-            "id": self.id,
-            "first_name": self.first_name,
-            "last_name": self.last_name,
-            "email": self.email,
-            "admin": self.admin
-        }
-        return obj
+        return {field: getattr(self, field) for field in self.fields}
 
     def from_dict(self, data, new_user=False):
         for field in ['first_name', 'last_name', 'email', 'admin']:
             if field in data:
                 setattr(self, field, data[field])
         if new_user:
-            self.set_password('abcdef')
+            self.set_password(DEFAULT_PASSWORD)
 
     @staticmethod
     def check_data(data: dict, new: bool = False):
-        error = utils.check_data(data, definition, new) \
-            or utils.check_name(data, 'first_name') \
-            or utils.check_name(data, 'last_name') \
-            or utils.check_email(data, 'email')
+        return schema.check(data, new)
+
+
+def previous_value(target, key):
+    history = get_history(target, key)
+    return (history.deleted or history.unchanged or [None])[0]
+
+
+def discard_cached_token(connection, target):
+    """Drop the identity cached for the token `target` held before the
+    flush, here at once and in the other workers through revoked_token.
+    """
+    token = previous_value(target, 'token')
+    token_exp = previous_value(target, 'token_exp')
+    if token is None or token_exp is None:
+        return
+    token_cache.discard(token)
+    RevokedToken.revoke_in_flush(connection, token_key(token), token_exp)
+
+
+@event.listens_for(User, 'after_update')
+def discard_updated_token(mapper, connection, target):
+    if get_history(target, 'token').has_changes() \
+            or get_history(target, 'admin').has_changes():
+        discard_cached_token(connection, target)
+
 
-        return error
+@event.listens_for(User, 'after_delete')
+def discard_deleted_token(mapper, connection, target):
+    discard_cached_token(connection, target)
@@ -13,36 +13,34 @@ TYPES = {
     type(None): 'null'
 }
 
+NAME_REGEX = re.compile(r'\w+( \w+)*')
+EMAIL_REGEX = re.compile(
+    r'(^[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+$)'
+)
+DATETIME_REGEX = re.compile(r'^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}$')
+PHONE_REGEX = re.compile(r'(^(\+?[1-9]{1}[0-9]*)?([ -]*[0-9 ]*)+$)')
+
 
 def check_name(data: dict, key: str) -> Any:
     if key in data and type(data[key]) == str:
-        name_regex = re.compile(
-            r'\w+( \w+)*'
-        )
-        if re.fullmatch(name_regex, data[key]) is None:
+        if NAME_REGEX.fullmatch(data[key]) is None:
             return f'campo {key} inválido'
     return None
 
 
 def check_email(data: dict, key: str) -> Any:
     if key in data and type(data[key]) == str:
-        email_regex = re.compile(
-            r'(^[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+$)'
-        )
-        if re.fullmatch(email_regex, data[key]) is None:
+        if EMAIL_REGEX.fullmatch(data[key]) is None:
             return f'campo {key} inválido'
     return None
 
 
 def check_datetime(data: dict, key: str) -> Any:
     if key in data and type(data[key]) == str:
-        datetime_regex = re.compile(
-            r'^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}$'
-        )
-        if re.fullmatch(datetime_regex, data[key]) is None:
+        if DATETIME_REGEX.fullmatch(data[key]) is None:
             return f'campo {key} deve ter o formato aaaa-mm-ddThh:mm'
         try:
-            data[key] = dt.strptime(data[key], '%Y-%m-%dT%H:%M')
+            data[key] = dt.fromisoformat(data[key])
         except ValueError:
             return f'campo {key} inválido'
     return None
@@ -50,29 +48,54 @@ def check_datetime(data: dict, key: str) -> Any:
 
 def check_phone(data: dict, key: str) -> Any:
     if key in data and type(data[key]) == str:
-        phone_regex = re.compile(
-            r'(^(\+?[1-9]{1}[0-9]*)?([ -]*[0-9 ]*)+$)'
-        )
-        if re.fullmatch(phone_regex, data[key]) is None:
+        if PHONE_REGEX.fullmatch(data[key]) is None:
             return f'campo {key} inválido'
     return None
 
 
-def check_data(
-    data: dict,
-    definition: dict,
-    new: bool
-) -> Any:
-    if len(data) == 0:
-        return 'pedido vazio'
-    for key, value in data.items():
-        if key not in definition['types']:
-            return f'campo inválido: {key}'
-        if type(value) not in definition['types'][key]:
-            tipos = ', '.join([TYPES[t] for t in definition['types'][key]])
-            return f"{key} deve ser do(s) tipo(s): {tipos}"
-    if new:
-        for key in definition['required']:
-            if key not in data:
-                return f'campo obrigatório: {key}'
-    return None
+class Schema:
+    """A model `definition` compiled once into a validator.
+
+    Type sets, error messages and the field checks are built here, at
+    import time, so `check` only does lookups and regex matches.
+    """
+
+    def __init__(self, definition: dict, names: tuple = (),
+                 emails: tuple = (), phones: tuple = (),
+                 datetimes: tuple = ()):
+        self.types = {
+            key: frozenset(types)
+            for key, types in definition['types'].items()
+        }
+        self.type_errors = {
+            key: f"{key} deve ser do(s) tipo(s): "
+                 f"{', '.join(TYPES[t] for t in types)}"
+            for key, types in definition['types'].items()
+        }
+        self.required = tuple(definition['required'])
+        self.checks = tuple(
+            [(check_name, key) for key in names] +
+            [(check_email, key) for key in emails] +
+            [(check_phone, key) for key in phones] +
+            [(check_datetime, key) for key in datetimes]
+        )
+
+    def check(self, data: dict, new: bool = False) -> Any:
+        if len(data) == 0:
+            return 'pedido vazio'
+        types = self.types
+        for key, value in data.items():
+            allowed = types.get(key)
+            if allowed is None:
+                return f'campo inválido: {key}'
+            if type(value) not in allowed:
+                return self.type_errors[key]
+        if new:
+            for key in self.required:
+                if key not in data:
+                    return f'campo obrigatório: {key}'
+        for check, key in self.checks:
+            error = check(data, key)
+            if error:
+                return error
+        return None
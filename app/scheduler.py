@@ -0,0 +1,37 @@
+import threading
+from app.models import db, OverdueLending, StatCounter
+from app.models.stat_counter import COUNTERS
+
+
+class OverdueScheduler:
+    """Rebuilds the overdue_lending snapshot and recounts the dashboard
+    counters every `interval` seconds.
+
+    It only runs from `flask run_scheduler`, in a process of its own:
+    create_app never starts it, so migrations, seeds and the other
+    commands don't race with a scan.
+    """
+
+    def __init__(self):
+        self._stopped = threading.Event()
+
+    def run(self, app, interval):
+        self._stopped.clear()
+        while not self._stopped.is_set():
+            with app.app_context():
+                try:
+                    OverdueLending.scan()
+                    StatCounter.recount(db.session, COUNTERS)
+                    db.session.commit()
+                except Exception:
+                    db.session.rollback()
+                    app.logger.exception(
+                        'falha ao verificar empréstimos atrasados'
+                    )
+            self._stopped.wait(interval)
+
+    def stop(self):
+        self._stopped.set()
+
+
+overdue_scheduler = OverdueScheduler()
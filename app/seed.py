@@ -0,0 +1,135 @@
+from datetime import datetime as dt, timedelta
+from itertools import islice
+from random import Random
+from app.models import (
+    db, Category, Item, Lending, Reservation, StatCounter, TableVersion,
+    Thirdparty, User
+)
+from app.models.table_version import VERSIONED
+
+
+def insert(table, rows, batch_size: int) -> int:
+    """Insert the `rows` iterable with one executemany per batch."""
+    rows = iter(rows)
+    count = 0
+    while True:
+        batch = list(islice(rows, batch_size))
+        if not batch:
+            return count
+        db.session.execute(table.insert(), batch)
+        count += len(batch)
+
+
+def id_range(model, count: int) -> range:
+    first = (db.session.query(db.func.max(model.id)).scalar() or 0) + 1
+    return range(first, first + count)
+
+
+def sync_sequence(model):
+    """Move PostgreSQL's id sequence past the ids inserted explicitly, so
+    the next insert through the ORM does not reuse them.
+    """
+    if db.engine.dialect.name != 'postgresql':
+        return
+    table = db.engine.dialect.identifier_preparer.format_table(
+        model.__table__
+    )
+    db.session.execute(
+        db.text(f"SELECT setval(pg_get_serial_sequence(:table, 'id'), "
+                f"(SELECT max(id) FROM {table}))"),
+        {'table': table}
+    )
+
+
+def seed(scale: int, seed: int = 0, batch_size: int = 10000) -> dict:
+    """Insert `scale` lendings and, in proportion, users, thirdparties,
+    categories, items and reservations. Does not commit.
+
+    Foreign keys always point to existing rows, the lendings of an item
+    never overlap, every unavailable item has exactly one open lending
+    and no two reservations overlap. All users share one password hash,
+    so seeding costs a single hash.
+    """
+    random = Random(seed)
+    now = dt.utcnow().replace(second=0, microsecond=0)
+    password = User.default_password_hash()
+    counts = {}
+
+    users = id_range(User, max(1, scale // 1000))
+    counts['user'] = insert(User.__table__, (
+        {'id': id, 'first_name': 'Usuario', 'last_name': f'N{id}',
+         'email': f'usuario{id}@example.com', 'password': password,
+         'admin': False} for id in users
+    ), batch_size)
+
+    thirdparties = id_range(Thirdparty, max(1, scale // 100))
+    counts['thirdparty'] = insert(Thirdparty.__table__, (
+        {'id': id, 'first_name': 'Terceiro', 'last_name': f'N{id}',
+         'email': f'terceiro{id}@example.com', 'phone': '35999999999'}
+        for id in thirdparties
+    ), batch_size)
+
+    categories = id_range(Category, 20)
+    counts['category'] = insert(Category.__table__, (
+        {'id': id, 'name': f'Categoria {id}'} for id in categories
+    ), batch_size)
+
+    items = id_range(Item, max(2, scale // 10))
+    lent = items[:max(1, min(len(items) // 20, scale))]
+    free = items[len(lent):]
+    counts['item'] = insert(Item.__table__, (
+        {'id': id, 'name': f'Item {id}', 'registry': f'R{id}',
+         'available': id >= free.start,
+         'category_id': random.choice(categories)} for id in items
+    ), batch_size)
+
+    # Returned lendings go round robin over the free items, 10 minutes
+    # apart, so each item's next lending starts after the last return.
+    returned = scale - len(lent)
+    longest = min(timedelta(days=7), timedelta(minutes=10 * len(free) - 1))
+
+    def lendings():
+        for i in range(returned):
+            date_start = now - timedelta(minutes=10 * (returned - i))
+            yield {
+                'item_id': free[i % len(free)],
+                'user_id': random.choice(users),
+                'thirdparty_id': random.choice(thirdparties),
+                'date_start': date_start,
+                'date_end': date_start + timedelta(days=7),
+                'date_return': min(now, date_start + timedelta(minutes=1)
+                                   + random.random() * longest)
+            }
+        for item_id in lent:
+            date_start = now - timedelta(days=random.randint(1, 14))
+            yield {
+                'item_id': item_id,
+                'user_id': random.choice(users),
+                'thirdparty_id': random.choice(thirdparties),
+                'date_start': date_start,
+                'date_end': date_start + timedelta(days=7),
+                'date_return': None
+            }
+
+    counts['lending'] = insert(Lending.__table__, lendings(), batch_size)
+
+    # One-hour reservations every two hours, half of them in the past
+    # unless earlier runs already booked that far.
+    reservations = max(1, scale // 10)
+    first = now - timedelta(hours=2 * (reservations // 2))
+    latest = db.session.query(db.func.max(Reservation.date_end)).scalar()
+    if latest is not None and latest > first:
+        first = latest + timedelta(hours=1)
+    counts['reservation'] = insert(Reservation.__table__, (
+        {'name': f'Reserva {i}', 'user_id': random.choice(users),
+         'thirdparty_id': random.choice(thirdparties),
+         'date_start': first + timedelta(hours=2 * i),
+         'date_end': first + timedelta(hours=2 * i + 1)}
+        for i in range(reservations)
+    ), batch_size)
+
+    for model in (User, Thirdparty, Category, Item):
+        sync_sequence(model)
+    StatCounter.recount(db.session, ['item', 'lending'])
+    TableVersion.bump(db.session, VERSIONED)
+    return counts
@@ -0,0 +1,105 @@
+from datetime import datetime
+from sqlalchemy import DateTime, String
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import FunctionElement
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    from flask.json.provider import DefaultJSONProvider
+except ImportError:  # Flask < 2.2 has no JSON providers
+    DefaultJSONProvider = None
+    from flask.json import JSONEncoder as FlaskJSONEncoder
+
+
+def format_datetime(value: datetime) -> str:
+    """The aaaa-mm-ddThh:mm format the API also accepts as input."""
+    return value.isoformat(timespec='minutes')
+
+
+class minute_string(FunctionElement):
+    """A DateTime column formatted by `format_datetime`'s rules in SQL,
+    so rows fetched for JSON skip parsing and formatting in Python.
+    Other databases return the datetime for the JSON encoder to format.
+    """
+    type = String()
+    name = 'minute_string'
+    inherit_cache = True
+
+
+@compiles(minute_string)
+def minute_string_default(element, compiler, **kwargs):
+    return compiler.process(element.clauses, **kwargs)
+
+
+@compiles(minute_string, 'sqlite')
+def minute_string_sqlite(element, compiler, **kwargs):
+    return "strftime('%Y-%m-%dT%H:%M', " \
+        f"{compiler.process(element.clauses, **kwargs)})"
+
+
+@compiles(minute_string, 'postgresql')
+def minute_string_postgresql(element, compiler, **kwargs):
+    return f"to_char({compiler.process(element.clauses, **kwargs)}, " \
+        "'YYYY-MM-DD\"T\"HH24:MI')"
+
+
+def json_column(column):
+    """`column` as selected for a JSON response."""
+    if isinstance(column.type, DateTime):
+        return minute_string(column).label(column.key)
+    return column
+
+
+if DefaultJSONProvider is not None:
+    class JSONProvider(DefaultJSONProvider):
+        """Encodes with orjson when `use_orjson` is set and with the
+        standard library otherwise. Both write the same JSON.
+        """
+        use_orjson = False
+
+        @staticmethod
+        def default(value):
+            if isinstance(value, datetime):
+                return format_datetime(value)
+            return DefaultJSONProvider.default(value)
+
+        def dumps(self, obj, **kwargs) -> str:
+            if not self.use_orjson:
+                return super().dumps(obj, **kwargs)
+            option = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+            if kwargs.get('sort_keys', self.sort_keys):
+                option |= orjson.OPT_SORT_KEYS
+            if kwargs.get('indent'):
+                option |= orjson.OPT_INDENT_2
+            return orjson.dumps(obj, default=self.default,
+                                option=option).decode()
+
+        def loads(self, s, **kwargs):
+            if not self.use_orjson:
+                return super().loads(s, **kwargs)
+            return orjson.loads(s)
+else:
+    class JSONEncoder(FlaskJSONEncoder):
+        def default(self, value):
+            if isinstance(value, datetime):
+                return format_datetime(value)
+            return super().default(value)
+
+
+def init_app(app):
+    """Install the JSON encoder named by JSON_ENCODER: 'orjson', 'json'
+    or 'auto', which picks orjson when it is installed.
+    """
+    encoder = app.config.get('JSON_ENCODER', 'auto')
+    if encoder == 'orjson' and orjson is None:
+        raise RuntimeError('JSON_ENCODER=orjson requer o pacote orjson')
+
+    if DefaultJSONProvider is None:
+        app.json_encoder = JSONEncoder
+        return
+    app.json = JSONProvider(app)
+    app.json.use_orjson = orjson is not None and encoder != 'json'
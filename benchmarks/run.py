@@ -0,0 +1,285 @@
+"""Benchmark the API routes against a seeded database.
+
+    python benchmarks/run.py --scale 10000 --save sqlite-10k
+    python benchmarks/run.py --scale 10000 --compare sqlite-10k
+    python benchmarks/run.py --database postgresql://localhost/qm_bench \\
+        --scale 1000000 --save postgres-1m
+
+Requests go through the app's WSGI stack with Flask's test client, so
+the figures cover routing, auth, controllers, the database and JSON, but
+not an HTTP server. The response cache is disabled unless --cache is
+given, so every request reaches its controller.
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import sys
+import tempfile
+from datetime import datetime as dt, timedelta
+from time import perf_counter
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINES = os.path.join(ROOT, 'benchmarks', 'baselines')
+sys.path.insert(0, ROOT)
+
+EXPORT = ['/api/categories', '/api/items/all', '/api/thirdparties',
+          '/api/users', '/api/lendings/all', '/api/reservations/all']
+
+
+def percentile(values: list, p: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))]
+
+
+def peak_rss_mb() -> float:
+    """Peak RSS of the whole run, seeding included."""
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / 1024 ** 2 if sys.platform == 'darwin' else rss / 1024
+
+
+def reset_peak_rss() -> bool:
+    """Restart the peak RSS that `scenario_peak_rss_mb` reads. Linux
+    only.
+    """
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+    except OSError:
+        return False
+    return True
+
+
+def scenario_peak_rss_mb() -> float:
+    """Peak RSS since the last `reset_peak_rss`."""
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith('VmHWM:'):
+                return int(line.split()[1]) / 1024
+
+
+def setup(scale: int, seed: int, batch_size: int):
+    from app import create_app
+    from app.models import db, Lending, StatCounter, TableVersion, User
+    from app.models.stat_counter import COUNTERS
+    from app.models.table_version import VERSIONED
+    from app.seed import seed as seed_rows
+
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        if TableVersion.query.count() == 0:
+            db.session.add_all(TableVersion(name=name, version=0)
+                               for name in VERSIONED)
+            db.session.add_all(StatCounter(name=name, value=0)
+                               for name in COUNTERS)
+        if User.query.filter_by(email='admin@admin.com').first() is None:
+            user = User()
+            user.from_dict({'first_name': 'Admin', 'last_name': 'Admin',
+                            'email': 'admin@admin.com', 'admin': True},
+                           new_user=True)
+            db.session.add(user)
+        db.session.commit()
+
+        existing = Lending.query.count()
+        if existing < scale:
+            start = perf_counter()
+            seed_rows(scale - existing, seed, batch_size)
+            db.session.commit()
+            print(f'seeded {scale - existing} lendings in '
+                  f'{perf_counter() - start:.1f}s', file=sys.stderr)
+    return app
+
+
+class Scenarios:
+    def __init__(self, client):
+        self.client = client
+        response = client.post('/api/login', json={
+            'email': 'admin@admin.com', 'password': 'abcdef'
+        })
+        self.headers = {'Authorization': 'Bearer ' + response.json['token']}
+        self.cursor = None
+        self.lendings = []
+
+    def expect(self, response, status: int):
+        response.get_data()
+        if response.status_code != status:
+            raise RuntimeError(f'{response.status_code} {response.json}')
+
+    def login(self, i: int):
+        self.expect(self.client.post('/api/login', json={
+            'email': 'admin@admin.com', 'password': 'abcdef'
+        }), 200)
+
+    def list_items(self, i: int):
+        url = '/api/items/all?limit=100'
+        if self.cursor:
+            url += '&after=' + self.cursor
+        response = self.client.get(url, headers=self.headers)
+        self.expect(response, 200)
+        self.cursor = response.headers.get('X-Next-Cursor')
+
+    def create_lending(self, i: int):
+        response = self.client.post('/api/lendings/checkout',
+                                    headers=self.headers,
+                                    json={'item_id': self.items[i],
+                                          'date_end': self.date_end})
+        self.expect(response, 201)
+        self.lendings.append(response.json['id'])
+
+    def reservation_conflict(self, i: int):
+        self.expect(self.client.post('/api/reservations',
+                                     headers=self.headers,
+                                     json=self.conflict), 400)
+
+    def export(self, i: int):
+        for url in EXPORT:
+            self.expect(self.client.get(url + '?stream=1',
+                                        headers=self.headers), 200)
+
+    def prepare(self, name: str, count: int):
+        if name == 'create_lending':
+            response = self.client.get(f'/api/items?limit={count}',
+                                       headers=self.headers)
+            self.items = [item['id'] for item in response.json]
+            if len(self.items) < count:
+                raise RuntimeError('itens disponíveis insuficientes')
+            self.date_end = (dt.utcnow() + timedelta(days=7)) \
+                .isoformat(timespec='minutes')
+        elif name == 'reservation_conflict':
+            reservation = self.client.get('/api/reservations?limit=1',
+                                          headers=self.headers).json[0]
+            self.conflict = {'name': 'Conflito',
+                             'date_start': reservation['date_start'],
+                             'date_end': reservation['date_end']}
+
+    def cleanup(self, name: str):
+        # Return what create_lending checked out so reruns find the same
+        # data.
+        for id in self.lendings:
+            self.client.post(f'/api/lendings/{id}/return',
+                             headers=self.headers)
+        self.lendings = []
+
+
+def run(scenarios: Scenarios, name: str, count: int, warmup: int) -> dict:
+    view = getattr(scenarios, name)
+    scenarios.prepare(name, count + warmup)
+    for i in range(warmup):
+        view(count + i)
+    latencies = []
+    resettable = reset_peak_rss()
+    start = perf_counter()
+    for i in range(count):
+        before = perf_counter()
+        view(i)
+        latencies.append(perf_counter() - before)
+    elapsed = perf_counter() - start
+    peak_rss = scenario_peak_rss_mb() if resettable else None
+    scenarios.cleanup(name)
+    return {
+        'requests': count,
+        'p50_ms': 1000 * percentile(latencies, 50),
+        'p95_ms': 1000 * percentile(latencies, 95),
+        'p99_ms': 1000 * percentile(latencies, 99),
+        'throughput_rps': count / elapsed,
+        'peak_rss_mb': peak_rss
+    }
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    regressions = []
+    for name, result in results['scenarios'].items():
+        base = baseline['scenarios'].get(name)
+        if base is None:
+            continue
+        if result['p95_ms'] > base['p95_ms'] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {base['p95_ms']:.1f} -> "
+                               f"{result['p95_ms']:.1f} ms")
+        if result['throughput_rps'] < base['throughput_rps'] \
+                * (1 - tolerance):
+            regressions.append(f"{name}: throughput "
+                               f"{base['throughput_rps']:.1f} -> "
+                               f"{result['throughput_rps']:.1f} req/s")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--database', help='SQLAlchemy URL; defaults to a '
+                        'new SQLite file')
+    parser.add_argument('--scale', type=int, default=10000,
+                        help='number of lendings to seed')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--batch-size', type=int, default=10000)
+    parser.add_argument('--requests', type=int, default=200,
+                        help='requests per scenario; login runs a tenth')
+    parser.add_argument('--export-requests', type=int, default=3)
+    parser.add_argument('--warmup', type=int, default=5)
+    parser.add_argument('--scenario', action='append',
+                        help='run only these scenarios')
+    parser.add_argument('--cache', action='store_true',
+                        help='keep the response cache enabled')
+    parser.add_argument('--save', metavar='NAME',
+                        help='save the results as baselines/NAME.json')
+    parser.add_argument('--compare', metavar='NAME',
+                        help='fail if slower than baselines/NAME.json')
+    parser.add_argument('--tolerance', type=float, default=0.2)
+    args = parser.parse_args()
+
+    os.environ['DATABASE_URL'] = args.database or 'sqlite:///' + \
+        os.path.join(tempfile.mkdtemp(), 'bench.db')
+    if not args.cache:
+        os.environ['RESPONSE_CACHE_SIZE'] = '0'
+
+    app = setup(args.scale, args.seed, args.batch_size)
+    scenarios = Scenarios(app.test_client())
+    counts = {
+        'login': max(1, args.requests // 10),
+        'list_items': args.requests,
+        'create_lending': args.requests,
+        'reservation_conflict': args.requests,
+        'export': args.export_requests,
+    }
+    names = args.scenario or list(counts)
+
+    from app.models import db
+    with app.app_context():
+        dialect = db.engine.dialect.name
+    results = {
+        'scale': args.scale,
+        'database': dialect,
+        'python': platform.python_version(),
+        'date': dt.utcnow().isoformat(timespec='seconds'),
+        'scenarios': {}
+    }
+    print(f"{'scenario':<22}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+          f"{'req/s':>10}{'rss MB':>10}")
+    for name in names:
+        result = run(scenarios, name, counts[name], args.warmup)
+        results['scenarios'][name] = result
+        rss = result['peak_rss_mb']
+        print(f"{name:<22}{result['p50_ms']:>10.2f}{result['p95_ms']:>10.2f}"
+              f"{result['p99_ms']:>10.2f}{result['throughput_rps']:>10.1f}"
+              f"{'-' if rss is None else f'{rss:.1f}':>10}")
+    results['peak_rss_mb'] = peak_rss_mb()
+    print(f"peak RSS of the run, seeding included: "
+          f"{results['peak_rss_mb']:.1f} MB")
+
+    if args.save:
+        os.makedirs(BASELINES, exist_ok=True)
+        with open(os.path.join(BASELINES, args.save + '.json'), 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if args.compare:
+        with open(os.path.join(BASELINES, args.compare + '.json')) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for regression in regressions:
+            print('regression: ' + regression)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
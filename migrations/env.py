@@ -22,6 +22,21 @@ config.set_main_option('sqlalchemy.url',
                        current_app.config.get('SQLALCHEMY_DATABASE_URI'))
 target_metadata = current_app.extensions['migrate'].db.metadata
 
+
+def include_object(object, name, type_, reflected, compare_to):
+    """Leave out of autogenerate the full-text search tables, the
+    expression indexes and the index of the reservation period constraint,
+    which migrations create with raw SQL and no model describes.
+    """
+    if type_ == 'table':
+        return not name.startswith('search_index')
+    if type_ == 'index':
+        return not (name.endswith('_search')
+                    or name in ('ix_reservation_period',
+                                'reservation_period_excl'))
+    return True
+
+
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
@@ -73,6 +88,7 @@ def run_migrations_online():
     context.configure(connection=connection,
                       target_metadata=target_metadata,
                       process_revision_directives=process_revision_directives,
+                      include_object=include_object,
                       **current_app.extensions['migrate'].configure_args)
     
     try:
@@ -0,0 +1,35 @@
+"""partial indexes for open lendings and available items
+
+Revision ID: 0f6d2e4c9b58
+Revises: e41b9c06d8a3
+Create Date: 2026-10-18 18:05:33.902147
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0f6d2e4c9b58'
+down_revision = 'e41b9c06d8a3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_item_available_id', 'item', ['id'], unique=False,
+                    sqlite_where=sa.text('available = 1'),
+                    postgresql_where=sa.text('available'))
+    op.create_index('ix_lending_open_id', 'lending', ['id'], unique=False,
+                    sqlite_where=sa.text('date_return IS NULL'),
+                    postgresql_where=sa.text('date_return IS NULL'))
+    op.create_index('ix_lending_open_date_end', 'lending', ['date_end'],
+                    unique=False,
+                    sqlite_where=sa.text('date_return IS NULL'),
+                    postgresql_where=sa.text('date_return IS NULL'))
+
+
+def downgrade():
+    op.drop_index('ix_lending_open_date_end', table_name='lending')
+    op.drop_index('ix_lending_open_id', table_name='lending')
+    op.drop_index('ix_item_available_id', table_name='item')
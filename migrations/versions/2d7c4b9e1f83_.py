@@ -0,0 +1,43 @@
+"""reservation period exclusion constraint
+
+Revision ID: 2d7c4b9e1f83
+Revises: 6c1a9e3f4d70
+Create Date: 2026-10-18 21:42:05.318274
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2d7c4b9e1f83'
+down_revision = '6c1a9e3f4d70'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    overlaps = op.get_bind().execute(sa.text(
+        'SELECT a.id, b.id FROM reservation a JOIN reservation b '
+        'ON a.id < b.id AND tsrange(a.date_start, a.date_end) '
+        '&& tsrange(b.date_start, b.date_end) ORDER BY a.id, b.id LIMIT 20'
+    )).fetchall()
+    if overlaps:
+        pairs = ', '.join(f'{a} e {b}' for a, b in overlaps)
+        raise RuntimeError('reservas com períodos sobrepostos, ajuste-as '
+                           f'antes de migrar: {pairs}')
+    # The constraint's gist index also serves the overlap queries.
+    op.drop_index('ix_reservation_period', table_name='reservation')
+    op.execute('ALTER TABLE reservation ADD CONSTRAINT '
+               'reservation_period_excl EXCLUDE USING gist '
+               '(tsrange(date_start, date_end) WITH &&)')
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.drop_constraint('reservation_period_excl', 'reservation')
+    op.execute('CREATE INDEX ix_reservation_period ON reservation '
+               'USING gist (tsrange(date_start, date_end))')
@@ -0,0 +1,28 @@
+"""revoked_token table for the JWT denylist
+
+Revision ID: 3b1f6c2d9a47
+Revises: aae0c3ad32aa
+Create Date: 2026-10-18 10:12:41.218733
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3b1f6c2d9a47'
+down_revision = 'aae0c3ad32aa'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('revoked_token',
+    sa.Column('jti', sa.String(length=32), nullable=False),
+    sa.Column('exp', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('jti')
+    )
+
+
+def downgrade():
+    op.drop_table('revoked_token')
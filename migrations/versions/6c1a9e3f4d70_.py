@@ -0,0 +1,32 @@
+"""overdue_lending snapshot
+
+Revision ID: 6c1a9e3f4d70
+Revises: b83f5d1e7a29
+Create Date: 2026-10-18 19:21:48.105326
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6c1a9e3f4d70'
+down_revision = 'b83f5d1e7a29'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('overdue_lending',
+    sa.Column('lending_id', sa.Integer(), nullable=False),
+    sa.Column('date_end', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['lending_id'], ['lending.id'], onupdate='CASCADE', ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('lending_id')
+    )
+    op.execute("INSERT INTO table_version (name, version) "
+               "VALUES ('overdue_lending', 0)")
+
+
+def downgrade():
+    op.execute("DELETE FROM table_version WHERE name = 'overdue_lending'")
+    op.drop_table('overdue_lending')
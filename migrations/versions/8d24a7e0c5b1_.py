@@ -0,0 +1,31 @@
+"""reservation period indexes for conflict detection
+
+Revision ID: 8d24a7e0c5b1
+Revises: 3b1f6c2d9a47
+Create Date: 2026-10-18 11:03:17.540912
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8d24a7e0c5b1'
+down_revision = '3b1f6c2d9a47'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_reservation_date_end_date_start', 'reservation',
+                    ['date_end', 'date_start'], unique=False)
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute('CREATE INDEX ix_reservation_period ON reservation '
+                   'USING gist (tsrange(date_start, date_end))')
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        op.drop_index('ix_reservation_period', table_name='reservation')
+    op.drop_index('ix_reservation_date_end_date_start',
+                  table_name='reservation')
@@ -0,0 +1,39 @@
+"""stat_counter rows for dashboard counts
+
+Revision ID: b83f5d1e7a29
+Revises: 0f6d2e4c9b58
+Create Date: 2026-10-18 18:52:17.440812
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b83f5d1e7a29'
+down_revision = '0f6d2e4c9b58'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('stat_counter',
+    sa.Column('name', sa.String(length=64), nullable=False),
+    sa.Column('value', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+    available = 'available' if op.get_bind().dialect.name == 'postgresql' \
+        else 'available = 1'
+    op.execute(
+        "INSERT INTO stat_counter (name, value) "
+        f"SELECT 'available_items', count(*) FROM item WHERE {available}"
+    )
+    op.execute(
+        "INSERT INTO stat_counter (name, value) "
+        "SELECT 'open_lendings', count(*) FROM lending "
+        "WHERE date_return IS NULL"
+    )
+
+
+def downgrade():
+    op.drop_table('stat_counter')
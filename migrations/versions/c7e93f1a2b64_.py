@@ -0,0 +1,32 @@
+"""table_version counters for conditional GETs
+
+Revision ID: c7e93f1a2b64
+Revises: 8d24a7e0c5b1
+Create Date: 2026-10-18 13:41:05.602317
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c7e93f1a2b64'
+down_revision = '8d24a7e0c5b1'
+branch_labels = None
+depends_on = None
+
+TABLES = ['category', 'item', 'lending', 'reservation', 'thirdparty', 'user']
+
+
+def upgrade():
+    table_version = op.create_table('table_version',
+    sa.Column('name', sa.String(length=64), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+    op.bulk_insert(table_version,
+                   [{'name': name, 'version': 0} for name in TABLES])
+
+
+def downgrade():
+    op.drop_table('table_version')
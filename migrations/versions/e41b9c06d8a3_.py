@@ -0,0 +1,66 @@
+"""full-text search index over items, categories and thirdparties
+
+Revision ID: e41b9c06d8a3
+Revises: 5a0e8b7d3f12
+Create Date: 2026-10-18 16:40:12.385190
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e41b9c06d8a3'
+down_revision = '5a0e8b7d3f12'
+branch_labels = None
+depends_on = None
+
+# table: (kind, indexed columns, document expression), matching
+# app/models/search.py
+DOCUMENTS = {
+    'item': (1, 'name, description, registry',
+             "coalesce({0}name, '') || ' ' || coalesce({0}description, '') "
+             "|| ' ' || coalesce({0}registry, '')"),
+    'category': (2, 'name', "{0}name"),
+    'thirdparty': (3, 'first_name, last_name, email',
+                   "{0}first_name || ' ' || {0}last_name || ' ' || {0}email"),
+}
+
+
+def upgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        for table, (kind, columns, document) in DOCUMENTS.items():
+            op.execute(f'CREATE INDEX ix_{table}_search ON {table} '
+                       f"USING gin (to_tsvector('simple', "
+                       f"{document.format('')}))")
+        return
+
+    op.execute("CREATE VIRTUAL TABLE search_index USING fts5("
+               "kind, body, tokenize='unicode61 remove_diacritics 2')")
+    for table, (kind, columns, document) in DOCUMENTS.items():
+        insert = (f'INSERT INTO search_index(rowid, kind, body) '
+                  f"VALUES (new.id * 4 + {kind}, '{table}', "
+                  f'{document.format("new.")});')
+        delete = (f'DELETE FROM search_index '
+                  f'WHERE rowid = old.id * 4 + {kind};')
+        op.execute(f'INSERT INTO search_index(rowid, kind, body) '
+                   f"SELECT id * 4 + {kind}, '{table}', "
+                   f'{document.format("")} FROM {table}')
+        op.execute(f'CREATE TRIGGER {table}_search_insert AFTER INSERT '
+                   f'ON {table} BEGIN {insert} END')
+        op.execute(f'CREATE TRIGGER {table}_search_update AFTER UPDATE '
+                   f'OF {columns} ON {table} BEGIN {delete} {insert} END')
+        op.execute(f'CREATE TRIGGER {table}_search_delete AFTER DELETE '
+                   f'ON {table} BEGIN {delete} END')
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        for table in DOCUMENTS:
+            op.execute(f'DROP INDEX ix_{table}_search')
+        return
+
+    for table in DOCUMENTS:
+        for event in ['insert', 'update', 'delete']:
+            op.execute(f'DROP TRIGGER {table}_search_{event}')
+    op.execute('DROP TABLE search_index')